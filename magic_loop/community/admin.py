@@ -43,5 +43,19 @@ class FeedbackAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "comment__id", "value")
     list_filter = ("user", "value")
     search_fields = ("comment__id",)
-    list_editable = ("value",)
     list_per_page = 10
+
+    # the comment tallies only follow feedback given through the API, here it
+    # can only be deleted, and deletes take it off the tallies
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def delete_model(self, request, obj):
+        Feedback.objects.discard(Feedback.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        Feedback.objects.discard(queryset)
@@ -0,0 +1,70 @@
+from django.db import transaction
+
+from . import write_buffer
+from .models import Post
+from utils.pubsub import publish
+
+# Events of the post activity streams (PostViewSet.events), published once the
+# change is committed.
+
+COMMENT_CREATED = "comment-created"
+LIKE_COUNT = "like-count"
+PIN = "pin"
+
+
+def post_channel(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def like_count_events(post_ids) -> list:
+    # (post_id, data) of the current like counts, with the buffered likes
+    rows = list(Post.objects.filter(pk__in=post_ids).values("id", "likes_count"))
+    if write_buffer.enabled():
+        write_buffer.merge_pending_counts(rows, [])
+    return [
+        (row["id"], {"post": row["id"], "likes_count": row["likes_count"]})
+        for row in rows
+    ]
+
+
+def pin_event(post_id: int, comment_id) -> dict:
+    return {"post": post_id, "pinned_comment": comment_id}
+
+
+def current_events(post_id: int) -> list:
+    # sent when a stream opens, and so after every reconnect
+    pinned = (
+        Post.objects.filter(pk=post_id).values_list("pinned_comment", flat=True).first()
+    )
+    return [
+        *((LIKE_COUNT, data) for _, data in like_count_events([post_id])),
+        (PIN, pin_event(post_id, pinned)),
+    ]
+
+
+def publish_comment_created(comment, data: dict):
+    transaction.on_commit(
+        lambda: publish(post_channel(comment.post_id), COMMENT_CREATED, data)
+    )
+
+
+def publish_like_counts(post_ids):
+    post_ids = list(post_ids)
+
+    def send():
+        for post_id, data in like_count_events(post_ids):
+            publish(post_channel(post_id), LIKE_COUNT, data)
+
+    transaction.on_commit(send)
+
+
+def publish_pin(post_id: int):
+    def send():
+        comment_id = (
+            Post.objects.filter(pk=post_id)
+            .values_list("pinned_comment", flat=True)
+            .first()
+        )
+        publish(post_channel(post_id), PIN, pin_event(post_id, comment_id))
+
+    transaction.on_commit(send)
@@ -1,7 +1,7 @@
 import django_filters
-from django.db.models import Q
 
 from .models import Post
+from .search import get_post_search_backend
 
 
 class PostFilter(django_filters.FilterSet):
@@ -10,16 +10,25 @@ class PostFilter(django_filters.FilterSet):
     personal = django_filters.BooleanFilter(
         method="filter_personal", label="Personal posts"
     )
+    ordering = django_filters.ChoiceFilter(
+        choices=[("trending", "Trending")], method="filter_ordering", label="Ordering"
+    )
 
     class Meta:
         model = Post
-        fields = ["tag_id", "personal"]
+        fields = ["tag_id", "personal", "ordering"]
 
     @staticmethod
     def filter_search(queryset, name, value):
-        return queryset.filter(Q(title__icontains=value) | Q(content__icontains=value))
+        # ranked by relevance unless another ordering is asked for
+        return get_post_search_backend().search(queryset, value)
 
     def filter_personal(self, queryset, name, value):
         if value:
             return queryset.filter(author=self.request.user)
         return queryset
+
+    @staticmethod
+    def filter_ordering(queryset, name, value):
+        # an index scan over (trending_score, id)
+        return queryset.order_by("-trending_score", "-id")
@@ -0,0 +1,173 @@
+import random
+import time
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from community import write_buffer
+from community.models import Comment, Feedback, Post
+from community.views import FeedbackViewSet, PostViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay the same random likes and comment feedback once directly and "
+        "once through the write buffer inside a rolled back transaction, check "
+        "that reads merging the pending state and the flushed rows match the "
+        "direct writes and report the throughput of both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--operations", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        rng = random.Random(options["seed"])
+        operations = [
+            (
+                rng.choice(["like", "unlike", "comment-like", "comment-dislike"]),
+                rng.randrange(options["posts"]),
+                rng.randrange(users),
+            )
+            for _ in range(options["operations"])
+        ]
+
+        # a prefix of its own, the rolled back ids must not leave state behind
+        prefix = f"{write_buffer.KEY_PREFIX}-bench-{uuid.uuid4().hex}"
+        try:
+            with transaction.atomic(), mock.patch.object(
+                write_buffer, "KEY_PREFIX", prefix
+            ):
+                users = get_user_model().objects.bulk_create(
+                    get_user_model()(
+                        username=f"bench-buffer-{i}",
+                        email=f"bench-buffer-{i}@example.com",
+                    )
+                    for i in range(users)
+                )
+                direct = self.create_posts(users[0], options["posts"])
+                buffered = self.create_posts(users[0], options["posts"])
+
+                with override_settings(COMMUNITY_WRITE_BUFFER=False):
+                    direct_ms = self.replay(operations, direct, users)
+                with override_settings(COMMUNITY_WRITE_BUFFER=True):
+                    buffered_ms = self.replay(operations, buffered, users)
+                    merged = self.counts(buffered, merge=True)
+                    started = time.perf_counter()
+                    flushed = write_buffer.flush()
+                    flush_ms = (time.perf_counter() - started) * 1000
+
+                expected = self.counts(direct)
+                consistent = {
+                    "merged reads": merged == expected,
+                    "flushed counters": self.counts(buffered) == expected,
+                    "flushed rows": self.rows(buffered) == self.rows(direct),
+                }
+                raise Rollback
+        except Rollback:
+            pass
+
+        count = len(operations)
+        self.stdout.write(
+            f"direct:   {count} toggles in {direct_ms:.0f} ms, "
+            f"{count / direct_ms * 1000:.0f}/s"
+        )
+        self.stdout.write(
+            f"buffered: {count} toggles in {buffered_ms:.0f} ms, "
+            f"{count / buffered_ms * 1000:.0f}/s, "
+            f"flush of {flushed} slots in {flush_ms:.0f} ms"
+        )
+        for name, ok in consistent.items():
+            self.stdout.write(f"{name}: {'consistent' if ok else 'MISMATCH'}")
+
+    @staticmethod
+    def create_posts(author, count):
+        posts = Post.objects.bulk_create(
+            Post(author=author, title=f"bench post {i}", content="bench")
+            for i in range(count)
+        )
+        comments = Comment.objects.bulk_create(
+            Comment(author=author, post=post, content="bench") for post in posts
+        )
+        Post.objects.filter(pk__in=[post.pk for post in posts]).update(comment_count=1)
+        return list(zip(posts, comments))
+
+    @staticmethod
+    def replay(operations, targets, users) -> float:
+        factory = APIRequestFactory()
+        like = PostViewSet.as_view({"post": "like_unlike", "delete": "like_unlike"})
+        feedback = {
+            "comment-like": FeedbackViewSet.as_view({"post": "like"}),
+            "comment-dislike": FeedbackViewSet.as_view({"post": "dislike"}),
+        }
+
+        started = time.perf_counter()
+        for name, index, user_index in operations:
+            post, comment = targets[index]
+            if name in ("like", "unlike"):
+                method = factory.post if name == "like" else factory.delete
+                request = method(f"/community/posts/{post.pk}/like/")
+                force_authenticate(request, user=users[user_index])
+                like(request, pk=post.pk)
+            else:
+                request = factory.post(
+                    "/community/comment/", {"comment": comment.pk}, format="json"
+                )
+                force_authenticate(request, user=users[user_index])
+                feedback[name](request)
+        return (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def counts(targets, merge=False) -> list:
+        posts = [
+            {"id": post.pk, "likes_count": post.likes_count}
+            for post in Post.objects.filter(pk__in=[post.pk for post, _ in targets])
+        ]
+        comments = [
+            {"id": comment.pk, "likes": comment.likes, "dislikes": comment.dislikes}
+            for comment in Comment.objects.filter(
+                pk__in=[comment.pk for _, comment in targets]
+            )
+        ]
+        if merge:
+            write_buffer.merge_pending_counts(posts, comments)
+        post_index = {post.pk: i for i, (post, _) in enumerate(targets)}
+        comment_index = {comment.pk: i for i, (_, comment) in enumerate(targets)}
+        return sorted(
+            [(post_index[row["id"]], row["likes_count"]) for row in posts]
+            + [
+                (comment_index[row["id"]], row["likes"], row["dislikes"])
+                for row in comments
+            ]
+        )
+
+    @staticmethod
+    def rows(targets) -> tuple:
+        post_index = {post.pk: i for i, (post, _) in enumerate(targets)}
+        comment_index = {comment.pk: i for i, (_, comment) in enumerate(targets)}
+        likes = Post.likes.through.objects.filter(post_id__in=list(post_index))
+        feedback = Feedback.objects.filter(comment_id__in=list(comment_index))
+        return (
+            sorted(
+                (post_index[post_id], user_id)
+                for post_id, user_id in likes.values_list("post_id", "user_id")
+            ),
+            sorted(
+                (comment_index[comment_id], user_id, value)
+                for comment_id, user_id, value in feedback.values_list(
+                    "comment_id", "user_id", "value"
+                )
+            ),
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+
+from community.models import Comment, Feedback, Post
+from utils.counters import count_subquery
+from utils.response_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the stored like and comment counts and the pinned comment "
+        "of every post, and the like and dislike counts of every comment."
+    )
+
+    def handle(self, *args, **options):
+        # the most recently pinned comment wins if a post somehow has several
+        pinned = Comment.objects.filter(post_id=OuterRef("pk"), is_pinned=True)
+        with transaction.atomic():
+            updated = Post.objects.update(
+                likes_count=count_subquery(Post.likes.through.objects.all(), "post_id"),
+                comment_count=count_subquery(Comment.objects.all(), "post_id"),
+                pinned_comment=Subquery(
+                    pinned.order_by("-created_at").values("pk")[:1]
+                ),
+            )
+            unpinned = (
+                Comment.objects.filter(is_pinned=True)
+                .exclude(post__pinned_comment=F("pk"))
+                .update(is_pinned=False)
+            )
+            Comment.objects.update(
+                likes=count_subquery(Feedback.objects.filter(value=1), "comment_id"),
+                dislikes=count_subquery(
+                    Feedback.objects.filter(value=-1), "comment_id"
+                ),
+            )
+        invalidate(
+            "posts",
+            *(f"post:{pk}" for pk in Post.objects.values_list("pk", flat=True)),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Synced counters of {updated} posts, unpinned {unpinned} comments."
+            )
+        )
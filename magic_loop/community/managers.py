@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db import connections, models, transaction
+from django.db.models import F
+
+from utils.response_cache import invalidate
+
+FEEDBACK_COUNTS = {1: "likes", -1: "dislikes"}
+
+
+class FeedbackManager(models.Manager):
+    # The toggle runs as plain SQL because it needs the row counts and the
+    # RETURNING clause Django doesn't expose for deletes and conflict-ignoring
+    # inserts (SQLite 3.35+ and PostgreSQL both support them).
+
+    def toggle(self, user, comment, value: int) -> int:
+        # Gives the feedback, or removes it if the user already gave the same
+        # one. Returns the resulting value, 0 when removed.
+        changes = Counter()
+        with transaction.atomic(using=self.db):
+            while True:
+                previous = self._take(user.pk, comment.pk)
+                if previous is not None:
+                    changes[previous] -= 1
+                if previous == value:
+                    state = 0
+                    break
+                if self._put(user.pk, comment.pk, value):
+                    changes[value] += 1
+                    state = value
+                    break
+                # a concurrent request inserted the feedback after it was taken
+
+            counts = {
+                FEEDBACK_COUNTS[changed]: F(FEEDBACK_COUNTS[changed]) + delta
+                for changed, delta in changes.items()
+                if delta
+            }
+            if counts:
+                type(comment).objects.filter(pk=comment.pk).update(**counts)
+            tag = f"post:{comment.post_id}"
+            transaction.on_commit(lambda: invalidate(tag), using=self.db)
+        return state
+
+    def discard(self, feedback):
+        # Deletes the feedback of the queryset and takes it off the tallies,
+        # for deletes that don't go through toggle (the admin, deleted users).
+        table, _, comment, value = self._columns()
+        pk = connections[self.db].ops.quote_name(self.model._meta.pk.column)
+        sql, params = feedback.values("pk").query.sql_with_params()
+        with transaction.atomic(using=self.db):
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {pk} IN ({sql}) "
+                    f"RETURNING {comment}, {value}",
+                    params,
+                )
+                removed = Counter(map(tuple, cursor.fetchall()))
+
+            comments = self.model._meta.get_field("comment").related_model
+            for (comment_id, changed), count in removed.items():
+                counter = FEEDBACK_COUNTS[changed]
+                comments.objects.filter(pk=comment_id).update(
+                    **{counter: F(counter) - count}
+                )
+            tags = [
+                f"post:{post_id}"
+                for post_id in comments.objects.filter(
+                    pk__in={comment_id for comment_id, _ in removed}
+                )
+                .values_list("post_id", flat=True)
+                .distinct()
+            ]
+            if tags:
+                transaction.on_commit(lambda: invalidate(*tags), using=self.db)
+
+    def _columns(self):
+        opts = self.model._meta
+        quote = connections[self.db].ops.quote_name
+        return (
+            quote(opts.db_table),
+            *(
+                quote(opts.get_field(name).column)
+                for name in ("user", "comment", "value")
+            ),
+        )
+
+    def _take(self, user_id: int, comment_id: int):
+        # deletes the user's feedback and returns its value, None if there was none
+        table, user, comment, value = self._columns()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {user} = %s AND {comment} = %s "
+                f"RETURNING {value}",
+                [user_id, comment_id],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _put(self, user_id: int, comment_id: int, value: int) -> bool:
+        # inserts the feedback unless a row for the pair already exists
+        table, user, comment, value_column = self._columns()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({user}, {comment}, {value_column}) "
+                f"VALUES (%s, %s, %s) ON CONFLICT ({user}, {comment}) DO NOTHING",
+                [user_id, comment_id, value],
+            )
+            return cursor.rowcount == 1
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset):
+    counts = (
+        queryset.filter(post_id=OuterRef("pk"))
+        .order_by()
+        .values("post_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def populate_post_counters(apps, schema_editor):
+    Post = apps.get_model("community", "Post")
+    Comment = apps.get_model("community", "Comment")
+
+    pinned = Comment.objects.filter(post_id=OuterRef("pk"), is_pinned=True)
+    Post.objects.update(
+        likes_count=count(Post.likes.through.objects.all()),
+        comment_count=count(Comment.objects.all()),
+        pinned_comment=Subquery(pinned.order_by("-created_at").values("pk")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0006_post_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="pinned_comment",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="community.comment",
+            ),
+        ),
+        migrations.RunPython(populate_post_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:23
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_feedback_counts(apps, schema_editor):
+    Comment = apps.get_model("community", "Comment")
+    Feedback = apps.get_model("community", "Feedback")
+
+    def count(value):
+        counts = (
+            Feedback.objects.filter(comment_id=OuterRef("pk"), value=value)
+            .order_by()
+            .values("comment_id")
+            .annotate(total=Count("*"))
+            .values("total")
+        )
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Comment.objects.update(likes=count(1), dislikes=count(-1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0007_post_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="dislikes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="likes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_feedback_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0008_comment_feedback_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "is_pinned", "created_at", "id"],
+                name="community_c_post_id_772809_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:34
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# the weights and half-life of community/trending.py when this was written
+POST_WEIGHT = 1.0
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+HALF_LIFE = 12 * 60 * 60
+MIN_SCORE = 1e-3
+
+
+def populate_trending_scores(apps, schema_editor):
+    # existing likes and comments have no time of their own here, they decay
+    # from the time of the post
+    Post = apps.get_model("community", "Post")
+    now = timezone.now()
+    posts = []
+    for pk, created_at, likes, comments in Post.objects.values_list(
+        "pk", "created_at", "likes_count", "comment_count"
+    ).iterator():
+        age = (now - created_at).total_seconds()
+        weight = POST_WEIGHT + LIKE_WEIGHT * likes + COMMENT_WEIGHT * comments
+        score = weight * 0.5 ** (max(age, 0) / HALF_LIFE)
+        posts.append(Post(pk=pk, trending_score=score if score >= MIN_SCORE else 0))
+    Post.objects.bulk_update(posts, ["trending_score"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0009_comment_post_pinned_created_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="trending_score",
+            field=models.FloatField(default=1.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["trending_score", "id"], name="community_p_trendin_e20c0b_idx"
+            ),
+        ),
+        migrations.RunPython(populate_trending_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:52
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS community_post_fts USING fts5("
+        "title, content, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO community_post_fts (rowid, title, content) "
+        "SELECT id, title, content FROM community_post"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS community_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0010_post_trending_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,10 +1,16 @@
 from django.conf import settings
 from django.db import models
 
+from .managers import FeedbackManager
+from .trending import POST_WEIGHT
+from utils.names import NamedManager
+
 
 class Tag(models.Model):
     name = models.CharField(max_length=255, unique=True)
 
+    objects = NamedManager()
+
     def __str__(self):
         return self.name
 
@@ -14,23 +20,34 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     image = models.ImageField(upload_to="post_images/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     tag = models.ManyToManyField(to=Tag, related_name="posts", blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     likes = models.ManyToManyField(
         to=settings.AUTH_USER_MODEL, related_name="liked_posts", blank=True
     )
+    # kept in sync by the signals in community/signals.py
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    trending_score = models.FloatField(default=POST_WEIGHT, editable=False)
+    pinned_comment = models.ForeignKey(
+        "Comment",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
-    @property
-    def comment_count(self) -> int:
-        return self.comments.count()
-
-    @property
-    def likes_count(self) -> int:
-        return self.likes.count()
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["trending_score", "id"]),
+        ]
 
     @property
     def has_pinned_comment(self) -> bool:
-        return self.comments.filter(is_pinned=True).exists()
+        return self.pinned_comment_id is not None
 
     def __str__(self):
         return f"{self.id}. {self.title}"
@@ -44,14 +61,12 @@ class Comment(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_pinned = models.BooleanField(default=False)
+    # tallies of feedback, kept in sync by FeedbackManager.toggle and discard
+    likes = models.PositiveIntegerField(default=0, editable=False)
+    dislikes = models.PositiveIntegerField(default=0, editable=False)
 
-    @property
-    def likes(self):
-        return self.feedback.filter(value=1).count()
-
-    @property
-    def dislikes(self):
-        return self.feedback.filter(value=-1).count()
+    class Meta:
+        indexes = [models.Index(fields=["post", "is_pinned", "created_at", "id"])]
 
     def __str__(self):
         return f"{self.id}"
@@ -64,5 +79,7 @@ class Feedback(models.Model):
     )
     value = models.IntegerField(choices=[(1, "Like"), (-1, "Dislike")])
 
+    objects = FeedbackManager()
+
     class Meta:
         unique_together = ("user", "comment")
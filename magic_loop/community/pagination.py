@@ -0,0 +1,7 @@
+from pattern.pagination import KeysetPagination
+
+
+class CommentPagination(KeysetPagination):
+    # pinned comment first, then the newest
+    ordering = ("-is_pinned", "-created_at", "-pk")
+    page_size = 20
@@ -0,0 +1,8 @@
+from utils.search import SearchIndex, get_search_backend
+from .models import Post
+
+post_index = SearchIndex(Post, {"title": 5.0, "content": 1.0}, snippet=True)
+
+
+def get_post_search_backend():
+    return get_search_backend(post_index)
@@ -1,6 +1,13 @@
+from django.db import transaction
+from django.urls import reverse
 from rest_framework import serializers
 
+from . import write_buffer
 from .models import Comment, Feedback, Post, Tag
+from .pagination import CommentPagination
+from utils.images import ImageVariantsField
+from utils.names import NamesField
+from utils.search import SnippetField
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -37,6 +44,7 @@ class EvaluateCommentSerializer(serializers.Serializer):
     class Meta:
         model = Comment
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         action = self.context.get("action")
 
@@ -45,22 +53,22 @@ class EvaluateCommentSerializer(serializers.Serializer):
                 "You can only pin comments on your posts."
             )
 
+        # Post.pinned_comment is claimed with a conditional update, so two
+        # concurrent pins can't both succeed
+        posts = Post.objects.filter(pk=instance.post_id)
         if action == "unpin":
-            if instance.is_pinned:
-                instance.is_pinned = False
-            else:
+            if not posts.filter(pinned_comment=instance).update(pinned_comment=None):
                 raise serializers.ValidationError(
                     "Can't unpin comment that has not been pinned."
                 )
+            instance.is_pinned = False
 
         elif action == "pin":
-            res = Comment.objects.filter(post=instance.post, is_pinned=True)
-            if not res.exists():
-                instance.is_pinned = True
-            else:
+            if not posts.filter(pinned_comment=None).update(pinned_comment=instance):
                 raise serializers.ValidationError(
                     "There already is pinned comment on this post."
                 )
+            instance.is_pinned = True
 
         instance.save()
         return instance
@@ -86,14 +94,24 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "comments",
         ]
 
-    @staticmethod
-    def get_comments(obj):
-        comments = obj.comments.order_by("-is_pinned", "-created_at")
-        return CommentSerializer(comments, many=True, read_only=True).data
+    def get_comments(self, obj):
+        # only the first page, the rest is at posts/{id}/comments/
+        paginator = CommentPagination()
+        page = paginator.paginate_first_page(
+            obj.comments.select_related("author"),
+            self.context["request"],
+            reverse("community:posts-comments", args=[obj.pk]),
+        )
+        return {
+            "next": paginator.get_next_link(),
+            "results": CommentSerializer(page, many=True).data,
+        }
 
 
 class PostSerializer(serializers.ModelSerializer):
     tags = TagSerializer(source="tag", many=True, read_only=True)
+    image_variants = ImageVariantsField()
+    snippet = SnippetField()
 
     class Meta:
         model = Post
@@ -105,15 +123,27 @@ class PostSerializer(serializers.ModelSerializer):
             "created_at",
             "tags",
             "image",
+            "image_variants",
             "comment_count",
             "likes_count",
+            "snippet",
         ]
 
 
 class AddPostSerializer(serializers.ModelSerializer):
+    # tags are given by id, by name or both, missing names are created
+    tag_names = NamesField(required=False, write_only=True)
+
     class Meta:
         model = Post
-        fields = ["title", "content", "tag", "image"]
+        fields = ["title", "content", "tag", "tag_names", "image"]
+
+    def create(self, validated_data):
+        names = validated_data.pop("tag_names", [])
+        if names:
+            tag_ids = Tag.objects.get_or_create_by_name(names)
+            validated_data["tag"] = [*validated_data.get("tag", []), *tag_ids.values()]
+        return super().create(validated_data)
 
 
 class FeedbackSerializer(serializers.ModelSerializer):
@@ -129,17 +159,8 @@ class FeedbackSerializer(serializers.ModelSerializer):
         else:
             action_value = -1
 
-        feedback = Feedback.objects.filter(user=user, comment=comment).first()
-
-        if feedback:
-            if feedback.value == action_value:
-                feedback.delete()
-                return feedback
-            else:
-                feedback.value = action_value
-                feedback.save()
-                return feedback
+        if write_buffer.enabled():
+            value = write_buffer.toggle_feedback(comment.pk, user.pk, action_value)
         else:
-            return Feedback.objects.create(
-                user=user, comment=comment, value=action_value
-            )
+            value = Feedback.objects.toggle(user, comment, action_value)
+        return Feedback(user=user, comment=comment, value=value)
@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import write_buffer
+from .events import publish_comment_created, publish_like_counts, publish_pin
+from .models import Comment, Feedback, Post
+from .search import get_post_search_backend
+from .serializers import CommentSerializer
+from .tasks import generate_post_image_variants
+from .trending import COUNTER_WEIGHTS, decayed
+from utils.images import image_variants_outdated
+from utils.response_cache import changed_m2m_ids, invalidate
+
+# posts per UPDATE of the counters, removed likes take back a weight per post
+# with two query parameters each, and SQLite limits the parameters of a query
+COUNTER_BATCH_SIZE = 300
+
+
+def invalidate_posts(post_ids):
+    tags = ["posts", *(f"post:{pk}" for pk in post_ids)]
+    transaction.on_commit(lambda: invalidate(*tags))
+
+
+def _update_post_counter(post_ids, counter: str, delta: int, created_at=None):
+    # created_at is when the removed interactions were added
+    if not post_ids or not delta:
+        return
+    weight = COUNTER_WEIGHTS[counter] * delta
+    post_ids = list(post_ids)
+    for start in range(0, len(post_ids), COUNTER_BATCH_SIZE):
+        posts = Post.objects.filter(pk__in=post_ids[start : start + COUNTER_BATCH_SIZE])
+        if delta > 0:
+            change = Value(weight)
+        elif created_at is not None:
+            change = Value(decayed(weight, created_at))
+        else:
+            # likes don't know when they were added, but they aren't older than
+            # their post, so its age never takes back more than they still weigh
+            change = Case(
+                *(
+                    When(pk=pk, then=Value(decayed(weight, post_created_at)))
+                    for pk, post_created_at in posts.values_list("pk", "created_at")
+                ),
+                default=Value(0.0),
+            )
+        posts.update(
+            **{counter: F(counter) + delta},
+            trending_score=Greatest(F("trending_score") + change, Value(0.0)),
+        )
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def update_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    # same as the saved_count of patterns: sent inside the transaction that
+    # changes the relation, removals are counted before the rows are deleted
+    if action in ("pre_remove", "pre_clear"):
+        if reverse:
+            rows = sender.objects.filter(user_id=instance.pk)
+            if pk_set is not None:
+                rows = rows.filter(post_id__in=pk_set)
+            instance._removed_likes = set(rows.values_list("post_id", flat=True))
+        else:
+            rows = sender.objects.filter(post_id=instance.pk)
+            if pk_set is not None:
+                rows = rows.filter(user_id__in=pk_set)
+            instance._removed_likes = rows.count()
+        return
+
+    if action == "post_add":
+        post_ids = pk_set if reverse else [instance.pk]
+        if reverse:
+            _update_post_counter(pk_set, "likes_count", 1)
+        else:
+            _update_post_counter([instance.pk], "likes_count", len(pk_set))
+
+    elif action in ("post_remove", "post_clear"):
+        removed = getattr(instance, "_removed_likes", None)
+        instance._removed_likes = None
+        post_ids = (removed or []) if reverse else [instance.pk]
+        if reverse:
+            _update_post_counter(removed, "likes_count", -1)
+        else:
+            _update_post_counter([instance.pk], "likes_count", -(removed or 0))
+
+    else:
+        return
+
+    # with the write buffer the like endpoint publishes the counts itself,
+    # here they'd be counted twice while a flush is applied
+    if not write_buffer.enabled():
+        publish_like_counts(post_ids)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        _update_post_counter([instance.post_id], "comment_count", 1)
+        publish_comment_created(instance, CommentSerializer(instance).data)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    # a no-op when the comment goes away with its post
+    _update_post_counter(
+        [instance.post_id], "comment_count", -1, created_at=instance.created_at
+    )
+
+
+@receiver(post_save, sender=Comment)
+def sync_pinned_comment(sender, instance, created, raw, **kwargs):
+    # the pin action claims Post.pinned_comment itself, this covers comments
+    # pinned or unpinned elsewhere, e.g. in the admin
+    if raw:
+        return
+    if instance.is_pinned:
+        Post.objects.filter(pk=instance.post_id, pinned_comment=None).update(
+            pinned_comment=instance
+        )
+    else:
+        Post.objects.filter(pk=instance.post_id, pinned_comment=instance).update(
+            pinned_comment=None
+        )
+    if not created:
+        publish_pin(instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, raw, **kwargs):
+    if not raw and image_variants_outdated(instance):
+        transaction.on_commit(lambda: generate_post_image_variants.delay(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: get_post_search_backend().update([instance]))
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_post_search_backend().remove([pk]))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_responses(sender, instance, **kwargs):
+    invalidate_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tag.through)
+@receiver(m2m_changed, sender=Post.likes.through)
+def invalidate_post_relation_responses(sender, **kwargs):
+    field = next(
+        field
+        for field in Post._meta.many_to_many
+        if field.remote_field.through is sender
+    )
+    post_ids = changed_m2m_ids(sender, field=field, **kwargs)
+    if post_ids:
+        invalidate_posts(post_ids)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses(sender, instance, **kwargs):
+    # post lists show the comment count, post details embed the comments
+    invalidate_posts([instance.post_id])
+
+
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+def invalidate_feedback_responses(sender, instance, **kwargs):
+    post_id = (
+        Comment.objects.filter(pk=instance.comment_id)
+        .values_list("post_id", flat=True)
+        .first()
+    )
+    if post_id:
+        tag = f"post:{post_id}"
+        transaction.on_commit(lambda: invalidate(tag))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def discard_user_feedback(sender, instance, **kwargs):
+    # the cascade would delete it without updating the comment tallies
+    Feedback.objects.discard(Feedback.objects.filter(user=instance))
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def clear_liked_posts(sender, instance, **kwargs):
+    # the cascade would delete the likes without sending m2m_changed
+    instance.liked_posts.clear()
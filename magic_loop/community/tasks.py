@@ -0,0 +1,35 @@
+from celery import shared_task
+from django.db.models import F
+
+from utils.images import update_image_variants
+from utils.response_cache import invalidate
+from . import write_buffer
+from .models import Post
+from .trending import DECAY_INTERVAL, HALF_LIFE, MIN_SCORE
+
+
+@shared_task
+def generate_post_image_variants(post_id: int):
+    update_image_variants(Post, post_id)
+    invalidate("posts", f"post:{post_id}")
+
+
+@shared_task
+def flush_write_buffer():
+    return write_buffer.flush()
+
+
+@shared_task
+def decay_trending_scores():
+    # every run decays by the beat interval, not by the time since the last
+    # run, nothing has to be shared between the worker processes for it
+    factor = 0.5 ** (DECAY_INTERVAL / HALF_LIFE)
+    scored = Post.objects.filter(trending_score__gt=0)
+    updated = scored.filter(trending_score__gte=MIN_SCORE / factor).update(
+        trending_score=F("trending_score") * factor
+    )
+    updated += scored.filter(trending_score__lt=MIN_SCORE / factor).update(
+        trending_score=0
+    )
+    invalidate("posts")
+    return updated
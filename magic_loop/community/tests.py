@@ -0,0 +1,228 @@
+import random
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import write_buffer
+from .models import Comment, Feedback, Post
+
+
+def create_users(count: int) -> list:
+    return [
+        get_user_model().objects.create(
+            username=f"user{i}", email=f"user{i}@example.com"
+        )
+        for i in range(count)
+    ]
+
+
+def tallies(post) -> tuple:
+    # the stored counters next to the counts of the rows they stand for
+    post.refresh_from_db()
+    comment = post.comments.get()
+    feedback = Feedback.objects.filter(comment=comment)
+    return (
+        (post.likes_count, comment.likes, comment.dislikes),
+        (
+            post.likes.count(),
+            feedback.filter(value=1).count(),
+            feedback.filter(value=-1).count(),
+        ),
+    )
+
+
+class WriteBufferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        write_buffer.cache.clear()
+        self.addCleanup(write_buffer.cache.clear)
+        self.users = create_users(10)
+
+        rng = random.Random(0)
+        self.operations = [
+            (
+                rng.choice(["like", "unlike", "comment-like", "comment-dislike"]),
+                rng.randrange(2),
+                rng.choice(self.users),
+            )
+            for _ in range(300)
+        ]
+
+    def create_posts(self) -> list:
+        posts = []
+        for i in range(2):
+            post = Post.objects.create(
+                author=self.users[0], title=f"post {i}", content="content"
+            )
+            Comment.objects.create(author=self.users[0], post=post, content="comment")
+            posts.append(post)
+        return posts
+
+    def replay(self, posts):
+        client = APIClient()
+        for name, index, user in self.operations:
+            post = posts[index]
+            client.force_authenticate(user)
+            if name == "like":
+                response = client.post(reverse("community:posts-like", args=[post.pk]))
+            elif name == "unlike":
+                response = client.delete(
+                    reverse("community:posts-like", args=[post.pk])
+                )
+            else:
+                response = client.post(
+                    reverse(f"community:feedback-{name.removeprefix('comment-')}"),
+                    {"comment": post.comments.get().pk},
+                    format="json",
+                )
+            self.assertLess(response.status_code, 300)
+
+    def test_flush_matches_direct_writes(self):
+        direct = self.create_posts()
+        self.replay(direct)
+
+        buffered = self.create_posts()
+        with override_settings(COMMUNITY_WRITE_BUFFER=True):
+            self.replay(buffered)
+            self.assertGreater(write_buffer.flush(), 0)
+
+        for direct_post, buffered_post in zip(direct, buffered):
+            counters, rows = tallies(buffered_post)
+            self.assertEqual(counters, rows)
+            self.assertEqual((counters, rows), tallies(direct_post))
+
+    def test_pending_counts_are_merged_before_the_flush(self):
+        posts = self.create_posts()
+        with override_settings(COMMUNITY_WRITE_BUFFER=True):
+            self.replay(posts)
+            rows = [{"id": post.pk, "likes_count": 0} for post in posts]
+            write_buffer.merge_pending_counts(rows, [])
+            write_buffer.flush()
+
+        for row, post in zip(rows, posts):
+            post.refresh_from_db()
+            self.assertEqual(row["likes_count"], post.likes_count)
+
+
+class WriteBufferRaceTests(TransactionTestCase):
+    def setUp(self):
+        write_buffer.cache.clear()
+        self.addCleanup(write_buffer.cache.clear)
+
+    @override_settings(COMMUNITY_WRITE_BUFFER=True)
+    def test_concurrent_toggles_of_a_pair_count_once(self):
+        [user] = create_users(1)
+        [post] = Post.objects.bulk_create(
+            [Post(author=user, title="post", content="content")]
+        )
+        [comment] = Comment.objects.bulk_create(
+            [Comment(author=user, post=post, content="comment")]
+        )
+        barrier = threading.Barrier(8)
+
+        def double_click():
+            try:
+                barrier.wait()
+                for _ in range(20):
+                    write_buffer.set_like(post.pk, user.pk, True)
+                    write_buffer.toggle_feedback(comment.pk, user.pk, 1)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=double_click) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        posts, comments = [{"id": post.pk, "likes_count": 0}], [
+            {"id": comment.pk, "likes": 0, "dislikes": 0}
+        ]
+        write_buffer.merge_pending_counts(posts, comments)
+        # 160 toggles of the same feedback end where they started
+        self.assertEqual((posts[0]["likes_count"], comments[0]["likes"]), (1, 0))
+
+        # and nothing stays pending once they are written
+        write_buffer.flush()
+        post.refresh_from_db()
+        self.assertEqual((post.likes_count, post.likes.count()), (1, 1))
+        rows = [{"id": post.pk, "likes_count": post.likes_count}]
+        write_buffer.merge_pending_counts(rows, [])
+        self.assertEqual(rows[0]["likes_count"], 1)
+
+
+class DeletedUserTests(TestCase):
+    def test_counters_drop_the_deleted_users_likes_and_feedback(self):
+        users = create_users(3)
+        post = Post.objects.create(author=users[0], title="post", content="content")
+        Comment.objects.create(author=users[0], post=post, content="comment")
+        comment = post.comments.get()
+        for user, value in zip(users, [1, -1, 1]):
+            post.likes.add(user)
+            Feedback.objects.toggle(user, comment, value)
+
+        users[2].delete()
+        get_user_model().objects.filter(pk=users[1].pk).delete()
+
+        counters, rows = tallies(post)
+        self.assertEqual(counters, rows)
+        self.assertEqual(counters, (1, 1, 0))
+
+    def test_deleting_a_user_with_many_likes(self):
+        [author, user] = create_users(2)
+        posts = Post.objects.bulk_create(
+            Post(author=author, title=f"post {i}", content="content", likes_count=1)
+            for i in range(700)
+        )
+        Post.likes.through.objects.bulk_create(
+            Post.likes.through(post_id=post.pk, user_id=user.pk) for post in posts
+        )
+
+        user.delete()
+        self.assertFalse(Post.objects.exclude(likes_count=0).exists())
+
+
+class FeedbackToggleTests(TransactionTestCase):
+    def test_concurrent_toggles_keep_tallies_in_step(self):
+        users = create_users(4)
+        # without the signals, their on_commit tasks would need a broker here
+        [post] = Post.objects.bulk_create(
+            [Post(author=users[0], title="post", content="content")]
+        )
+        [comment] = Comment.objects.bulk_create(
+            [Comment(author=users[0], post=post, content="comment")]
+        )
+
+        errors = []
+
+        def toggle(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(25):
+                    Feedback.objects.toggle(
+                        rng.choice(users), comment, rng.choice([1, -1])
+                    )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=toggle, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        comment.refresh_from_db()
+        feedback = Feedback.objects.filter(comment=comment)
+        self.assertEqual(
+            (comment.likes, comment.dislikes),
+            (feedback.filter(value=1).count(), feedback.filter(value=-1).count()),
+        )
+        self.assertLessEqual(feedback.count(), len(users))
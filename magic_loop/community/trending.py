@@ -0,0 +1,25 @@
+# A post's trending score is the sum of the weights of the post itself and of
+# its likes and comments, each decayed exponentially with its age. Interactions
+# add their weight to the stored score right away (community/signals.py), and
+# the decay_trending_scores task multiplies every score by the decay of one
+# DECAY_INTERVAL on each beat, so stored scores compare like the decayed sums.
+# Removals take back the decayed weight of what they remove.
+
+from django.utils import timezone
+
+POST_WEIGHT = 1.0
+COUNTER_WEIGHTS = {
+    "likes_count": 1.0,
+    "comment_count": 2.0,
+}
+HALF_LIFE = 12 * 60 * 60
+# the schedule of decay_trending_scores in CELERY_BEAT_SCHEDULE
+DECAY_INTERVAL = 10 * 60
+# scores below it are set to 0, so old posts aren't rewritten forever
+MIN_SCORE = 1e-3
+
+
+def decayed(weight: float, since) -> float:
+    # what is left of weight added at since
+    age = max((timezone.now() - since).total_seconds(), 0)
+    return weight * 0.5 ** (age / HALF_LIFE)
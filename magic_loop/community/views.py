@@ -1,13 +1,18 @@
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from . import write_buffer
+from .events import current_events, post_channel, publish_like_counts
 from .filtersets import PostFilter
 from .models import Comment, Feedback, Post, Tag
+from .pagination import CommentPagination
 from .serializers import (
     AddPostSerializer,
     PostSerializer,
@@ -18,24 +23,33 @@ from .serializers import (
     FeedbackSerializer,
     TagSerializer,
 )
-from utils.serializer_factory import SerializerFactory
+from utils.event_stream import (
+    EventStreamRenderer,
+    event_stream_response,
+    streaming_supported,
+)
+from utils.names import BulkNamesMixin
+from utils.response_cache import cache_response
+from utils.serializer_factory import SerializerFactory, SparseFieldsetMixin
+from utils.values_serializer import ValuesListModelMixin
 
 
-class TagViewSet(mixins.ListModelMixin, GenericViewSet):
+class TagViewSet(BulkNamesMixin, mixins.ListModelMixin, GenericViewSet):
     queryset = Tag.objects.order_by("id")
     permission_classes = [IsAuthenticated]
     serializer_class = TagSerializer
 
 
 class PostViewSet(
+    SparseFieldsetMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
-    mixins.ListModelMixin,
+    ValuesListModelMixin,
     mixins.DestroyModelMixin,
     GenericViewSet,
 ):
     queryset = (
-        Post.objects.prefetch_related("tag", "comments", "likes")
+        Post.objects.prefetch_related("tag")
         .select_related("author")
         .order_by("-created_at")
     )
@@ -50,6 +64,27 @@ class PostViewSet(
     filter_backends = [DjangoFilterBackend]
     filterset_class = PostFilter
 
+    @cache_response("posts", per_user=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response("post:{pk}")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # buffered likes and feedback are not in the stored (or cached) counts
+        if write_buffer.enabled() and response.status_code == 200:
+            data = response.data
+            if self.action == "list":
+                write_buffer.merge_pending_counts(data["results"], [])
+            elif self.action == "retrieve":
+                comments = data.get("comments") or {}
+                write_buffer.merge_pending_counts([data], comments.get("results", []))
+            elif self.action == "comments":
+                write_buffer.merge_pending_counts([], data["results"])
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -58,6 +93,42 @@ class PostViewSet(
             raise PermissionDenied("You can only delete your posts.")
         return super().destroy(request, *args, **kwargs)
 
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=CommentSerializer,
+        pagination_class=CommentPagination,
+        url_path="comments",
+        url_name="comments",
+    )
+    @cache_response("post:{pk}")
+    def comments(self, request, pk=None):
+        post = get_object_or_404(Post.objects.only("pk"), pk=pk)
+        page = self.paginate_queryset(post.comments.select_related("author"))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        serializer_class=None,
+        renderer_classes=[JSONRenderer, EventStreamRenderer],
+        url_path="events",
+        url_name="events",
+    )
+    def events(self, request, pk=None):
+        # Server-Sent Events with the new comments, like counts and pins of the
+        # post, instead of polling retrieve
+        post = get_object_or_404(Post.objects.only("pk"), pk=pk)
+        if not streaming_supported(request._request):
+            return Response(
+                {"detail": "The event stream is only served under ASGI."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        return event_stream_response(
+            post_channel(post.pk), lambda: current_events(post.pk)
+        )
+
     @action(
         detail=True,
         methods=["post", "delete"],
@@ -69,6 +140,12 @@ class PostViewSet(
     def like_unlike(self, request, pk=None):
         user = request.user
         post = self.get_object()
+        if post and write_buffer.enabled():
+            write_buffer.set_like(post.pk, user.pk, request.method == "POST")
+            publish_like_counts([post.pk])
+            if request.method == "POST":
+                return Response({"message": "Post liked successfully."})
+            return Response({"message": "Post unliked successfully."})
         if post:
             if request.method == "POST":
                 user.liked_posts.add(post)
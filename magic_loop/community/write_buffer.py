@@ -0,0 +1,316 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from django.utils.connection import ConnectionProxy
+
+from .models import Comment, Feedback, Post
+from utils.response_cache import invalidate
+
+# Post likes and comment feedback recorded in the cache and written to the
+# database in batches by flush(), see COMMUNITY_WRITE_BUFFER in the settings.
+#
+# Every toggle stores the resulting state of the (target, user) pair in a
+# numbered slot, flush() applies the slots in order and only the last state of
+# every pair reaches the database. Until then the pair's state is read from
+# its entry key, and the counters shown by the post endpoints are corrected
+# by the pending deltas of their targets. Reading and replacing the state of a
+# pair happens under a lock of the pair, two requests of a double click would
+# otherwise both move the counter from the same previous state.
+
+cache = ConnectionProxy(caches, "write_buffer")
+
+KEY_PREFIX = "community-buffer"
+# entries and deltas outlive many flushes, they only have to expire once the
+# buffer is idle so that leftovers of a crashed flush go away
+ENTRY_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 60
+PAIR_LOCK_TIMEOUT = 5
+FLUSH_BATCH_SIZE = 1000
+
+LIKE = "like"
+FEEDBACK = "feedback"
+
+# the counter a state of a pair adds to, states without one add to nothing
+COUNTERS = {
+    (LIKE, 1): "post-likes",
+    (FEEDBACK, 1): "comment-likes",
+    (FEEDBACK, -1): "comment-dislikes",
+}
+
+
+def enabled() -> bool:
+    return settings.COMMUNITY_WRITE_BUFFER
+
+
+def _key(*parts) -> str:
+    return ":".join([KEY_PREFIX, *map(str, parts)])
+
+
+def _entry_key(kind: str, target_id: int, user_id: int) -> str:
+    return _key("state", kind, target_id, user_id)
+
+
+def _delta_key(counter: str, target_id: int) -> str:
+    return _key("delta", counter, target_id)
+
+
+def _slot_key(number: int) -> str:
+    return _key("slot", number)
+
+
+def _incr(key: str, delta: int = 1, timeout=None) -> int:
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # evicted between add and incr
+        cache.set(key, delta, timeout)
+        return delta
+
+
+def _add_to_counter(kind: str, state: int, target_id: int, delta: int):
+    counter = COUNTERS.get((kind, state))
+    if counter is not None and delta:
+        key = _delta_key(counter, target_id)
+        _incr(key, delta, ENTRY_TIMEOUT)
+        cache.touch(key, ENTRY_TIMEOUT)
+
+
+@contextmanager
+def _pair_lock(kind: str, target_id: int, user_id: int):
+    key = _key("lock", kind, target_id, user_id)
+    # the lock expires if its holder dies, so waiting always ends
+    while not cache.add(key, 1, PAIR_LOCK_TIMEOUT):
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        cache.delete(key)
+
+
+def get_state(kind: str, target_id: int, user_id: int, load) -> int:
+    state = cache.get(_entry_key(kind, target_id, user_id))
+    return load() if state is None else state
+
+
+def record(kind: str, target_id: int, user_id: int, state: int, previous: int):
+    if state == previous:
+        return
+    number = _incr(_key("seq"))
+    cache.set(_slot_key(number), (kind, target_id, user_id, state), None)
+    cache.set(_entry_key(kind, target_id, user_id), state, ENTRY_TIMEOUT)
+    _add_to_counter(kind, previous, target_id, -1)
+    _add_to_counter(kind, state, target_id, 1)
+
+
+def set_like(post_id: int, user_id: int, liked: bool):
+    with _pair_lock(LIKE, post_id, user_id):
+        previous = get_state(
+            LIKE,
+            post_id,
+            user_id,
+            lambda: int(
+                Post.likes.through.objects.filter(
+                    post_id=post_id, user_id=user_id
+                ).exists()
+            ),
+        )
+        record(LIKE, post_id, user_id, int(liked), previous)
+
+
+def toggle_feedback(comment_id: int, user_id: int, value: int) -> int:
+    # same as FeedbackManager.toggle: giving the current feedback again removes it
+    with _pair_lock(FEEDBACK, comment_id, user_id):
+        previous = get_state(
+            FEEDBACK,
+            comment_id,
+            user_id,
+            lambda: Feedback.objects.filter(comment_id=comment_id, user_id=user_id)
+            .values_list("value", flat=True)
+            .first()
+            or 0,
+        )
+        state = 0 if previous == value else value
+        record(FEEDBACK, comment_id, user_id, state, previous)
+    return state
+
+
+def merge_pending_counts(posts, comments):
+    # posts and comments are serialized rows, fields left out by ?fields= are
+    # left out here too
+    fields = [
+        (row, field, _delta_key(counter, row["id"]))
+        for rows, counters in (
+            (posts, {"likes_count": "post-likes"}),
+            (comments, {"likes": "comment-likes", "dislikes": "comment-dislikes"}),
+        )
+        for row in rows
+        if "id" in row
+        for field, counter in counters.items()
+        if field in row
+    ]
+    deltas = cache.get_many([key for _, _, key in fields])
+    for row, field, key in fields:
+        row[field] = max(row[field] + deltas.get(key, 0), 0)
+
+
+def flush(batch_size: int = FLUSH_BATCH_SIZE) -> int:
+    # returns the number of slots applied, 0 if another flush is running
+    lock = _key("lock")
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        return 0
+    try:
+        applied = 0
+        while True:
+            count = _flush_batch(batch_size)
+            applied += count
+            if count < batch_size:
+                return applied
+    finally:
+        cache.delete(lock)
+
+
+def _flush_batch(batch_size: int) -> int:
+    flushed = cache.get(_key("flushed"), 0)
+    last = min(cache.get(_key("seq"), 0), flushed + batch_size)
+    numbers = range(flushed + 1, last + 1)
+    slots = cache.get_many([_slot_key(number) for number in numbers])
+
+    states = {}
+    done = flushed
+    for number in numbers:
+        slot = slots.get(_slot_key(number))
+        if slot is None:
+            # a writer between taking the number and storing the slot, wait
+            # for it once, after that the slot is taken as lost
+            if cache.get(_key("missing")) != number:
+                cache.set(_key("missing"), number, None)
+                break
+        else:
+            kind, target_id, user_id, state = slot
+            states[kind, target_id, user_id] = state
+        done = number
+    if done == flushed:
+        return 0
+
+    with transaction.atomic():
+        changes = _apply_likes(
+            {key[1:]: state for key, state in states.items() if key[0] == LIKE}
+        ) + _apply_feedback(
+            {key[1:]: state for key, state in states.items() if key[0] == FEEDBACK}
+        )
+
+    cache.set(_key("flushed"), done, None)
+    cache.delete_many([_slot_key(number) for number in range(flushed + 1, done + 1)])
+    # what reached the database is no longer pending
+    for kind, state, target_id, delta in changes:
+        _add_to_counter(kind, state, target_id, -delta)
+    return done - flushed
+
+
+def _existing(states: dict, model) -> dict:
+    # drops the pairs whose target or user was deleted since the toggle
+    targets = set(
+        model.objects.filter(pk__in={pk for pk, _ in states}).values_list(
+            "pk", flat=True
+        )
+    )
+    users = set(
+        get_user_model()
+        .objects.filter(pk__in={pk for _, pk in states})
+        .values_list("pk", flat=True)
+    )
+    return {
+        (target_id, user_id): state
+        for (target_id, user_id), state in states.items()
+        if target_id in targets and user_id in users
+    }
+
+
+def _apply_likes(states: dict) -> list:
+    states = _existing(states, Post)
+    if not states:
+        return []
+    existing = set(
+        Post.likes.through.objects.filter(
+            post_id__in={post_id for post_id, _ in states},
+            user_id__in={user_id for _, user_id in states},
+        ).values_list("post_id", "user_id")
+    )
+    added, removed = defaultdict(list), defaultdict(list)
+    for (post_id, user_id), state in states.items():
+        if state and (post_id, user_id) not in existing:
+            added[post_id].append(user_id)
+        elif not state and (post_id, user_id) in existing:
+            removed[post_id].append(user_id)
+
+    # through the related manager, so the signals update likes_count
+    for post_id, user_ids in added.items():
+        Post(pk=post_id).likes.add(*user_ids)
+    for post_id, user_ids in removed.items():
+        Post(pk=post_id).likes.remove(*user_ids)
+    return [
+        *((LIKE, 1, post_id, len(user_ids)) for post_id, user_ids in added.items()),
+        *((LIKE, 1, post_id, -len(user_ids)) for post_id, user_ids in removed.items()),
+    ]
+
+
+def _apply_feedback(states: dict) -> list:
+    states = _existing(states, Comment)
+    if not states:
+        return []
+    existing = {
+        (comment_id, user_id): (pk, value)
+        for pk, comment_id, user_id, value in Feedback.objects.filter(
+            comment_id__in={comment_id for comment_id, _ in states},
+            user_id__in={user_id for _, user_id in states},
+        ).values_list("pk", "comment_id", "user_id", "value")
+    }
+
+    created, deleted, updated = [], [], defaultdict(list)
+    counts = defaultdict(lambda: {1: 0, -1: 0})
+    for (comment_id, user_id), state in states.items():
+        pk, value = existing.get((comment_id, user_id), (None, 0))
+        if state == value:
+            continue
+        if value:
+            counts[comment_id][value] -= 1
+        if state:
+            counts[comment_id][state] += 1
+
+        if pk is None:
+            created.append(
+                Feedback(comment_id=comment_id, user_id=user_id, value=state)
+            )
+        elif not state:
+            deleted.append(pk)
+        else:
+            updated[state].append(pk)
+
+    Feedback.objects.bulk_create(created)
+    Feedback.objects.filter(pk__in=deleted).delete()
+    for value, pks in updated.items():
+        Feedback.objects.filter(pk__in=pks).update(value=value)
+    for comment_id, delta in counts.items():
+        Comment.objects.filter(pk=comment_id).update(
+            likes=F("likes") + delta[1], dislikes=F("dislikes") + delta[-1]
+        )
+
+    post_ids = set(
+        Comment.objects.filter(pk__in=list(counts)).values_list("post_id", flat=True)
+    )
+    tags = [f"post:{post_id}" for post_id in post_ids]
+    if tags:
+        transaction.on_commit(lambda: invalidate(*tags))
+    return [
+        (FEEDBACK, value, comment_id, count)
+        for comment_id, delta in counts.items()
+        for value, count in delta.items()
+        if count
+    ]
@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 
+from celery.schedules import crontab
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
     "community",
     "pattern",
     "projects",
+    "search",
 ]
 
 MIDDLEWARE = [
@@ -91,6 +94,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # a file rather than the shared in-memory database, where concurrent
+        # writers in the threaded tests fail instead of waiting for the lock
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
@@ -160,13 +166,68 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# list endpoints serialize .values() rows (utils.values_serializer), disable
+# to go through the regular DRF serializers
+VALUES_LIST_SERIALIZATION = config("VALUES_LIST_SERIALIZATION", default=True, cast=bool)
+
+# record post likes and comment feedback in the cache and write them to the
+# database in batches (community.write_buffer), for traffic spikes on hot
+# posts; needs the shared cache (CACHE_URL) and celery beat running the flush
+COMMUNITY_WRITE_BUFFER = config("COMMUNITY_WRITE_BUFFER", default=False, cast=bool)
+
+# set CACHE_URL (e.g. redis://localhost:6379/1) to share the cache between
+# worker processes, otherwise every process keeps its own local cache
+CACHE_URL = config("CACHE_URL", default=None)
+
 CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-    }
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+        if CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-snowflake",
+        }
+    ),
+    # pending writes of community.write_buffer, must not be culled with the
+    # cached responses (and the Redis server must not evict them either)
+    "write_buffer": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+        if CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "write-buffer",
+            "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+        }
+    ),
 }
 
+# the flush runs in the celery worker, it never sees a buffer kept in the
+# memory of the web process
+if COMMUNITY_WRITE_BUFFER and not CACHE_URL:
+    raise ImproperlyConfigured("COMMUNITY_WRITE_BUFFER requires CACHE_URL.")
+
+# cache API responses (utils/response_cache.py), on by default with the shared
+# cache; the other workers and the celery tasks invalidate them by bumping tag
+# versions, which a cache local to each process would never see
+RESPONSE_CACHE = config("RESPONSE_CACHE", default=bool(CACHE_URL), cast=bool)
+
+if RESPONSE_CACHE and not CACHE_URL:
+    raise ImproperlyConfigured("RESPONSE_CACHE requires CACHE_URL.")
+
+# broker of the post event streams (utils/pubsub.py), with more than one
+# process the events have to go through Redis to reach every stream
+PUBSUB = (
+    {"BROKER": "utils.pubsub.RedisBroker", "OPTIONS": {"url": CACHE_URL}}
+    if CACHE_URL
+    else {"BROKER": "utils.pubsub.LocalBroker"}
+)
+
 AUTH_USER_MODEL = "user.User"
 
 # set the celery broker url
@@ -178,6 +239,24 @@ CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
 # set the celery timezone
 CELERY_TIMEZONE = "UTC"
 
+# periodic tasks, run with `celery -A magic_loop beat`
+CELERY_BEAT_SCHEDULE = {
+    "rebuild-similar-patterns": {
+        "task": "pattern.tasks.rebuild_similar_patterns",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # every run decays the scores by DECAY_INTERVAL (community/trending.py),
+    # keep the two equal
+    "decay-trending-scores": {
+        "task": "community.tasks.decay_trending_scores",
+        "schedule": 10 * 60,
+    },
+    "flush-community-write-buffer": {
+        "task": "community.tasks.flush_write_buffer",
+        "schedule": 5.0,
+    },
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_USE_TLS = True
@@ -22,6 +22,7 @@ from django.contrib import admin
 from django.urls import path, include
 
 from .swagger import schema_view
+from utils.response_cache import ResponseCacheStatsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -29,12 +30,14 @@ urlpatterns = [
     path("community/", include("community.urls"), name="community"),
     path("patterns/", include("pattern.urls"), name="patterns"),
     path("projects/", include("projects.urls"), name="projects"),
+    path("search/", include("search.urls"), name="search"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
         name="schema-swagger-ui",
     ),
     path("api-auth/", include("rest_framework.urls")),
+    path("cache-stats/", ResponseCacheStatsView.as_view(), name="response-cache-stats"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,100 @@
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import CategoryClosure, Pattern
+from utils.response_cache import get_tag_versions
+
+FACETS_TIMEOUT = 30
+# ordering doesn't change the counts
+IGNORED_FILTERS = {"popular"}
+
+
+def facets_cache_key(filterset_class, query_params) -> str:
+    params = sorted(
+        (name, sorted(query_params.getlist(name)))
+        for name in filterset_class.base_filters
+        if name in query_params and name not in IGNORED_FILTERS
+    )
+    parts = [params, get_tag_versions(["patterns", "categories"])]
+    digest = hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+    return f"pattern-facets:{digest}"
+
+
+def compute_facets(queryset) -> dict:
+    # one grouped query per facet over the ids of the filtered patterns, so the
+    # filter is planned once as a subquery instead of once per facet value
+    ids = queryset.order_by().values("pk")
+    if queryset.query.extra or queryset.query.extra_tables:
+        # raw SQL (full-text search) can't be moved into a subquery
+        ids = list(ids.values_list("pk", flat=True))
+
+    difficulty = (
+        Pattern.objects.filter(pk__in=ids)
+        .values("difficulty")
+        .annotate(count=Count("pk"))
+        .order_by("difficulty")
+    )
+    yarn_types = (
+        Pattern.yarn_type.through.objects.filter(pattern__in=ids)
+        .values("yarntype_id", "yarntype__name")
+        .annotate(count=Count("pattern", distinct=True))
+        .order_by("-count", "yarntype__name")
+    )
+    tags = (
+        Pattern.tag.through.objects.filter(pattern__in=ids)
+        .values("patterntag_id", "patterntag__name")
+        .annotate(count=Count("pattern", distinct=True))
+        .order_by("-count", "patterntag__name")
+    )
+    # a pattern counts once towards the top-level category of each of its
+    # categories, wherever they are in the tree
+    categories = (
+        CategoryClosure.objects.filter(
+            ancestor__parent__isnull=True, descendant__patterns__in=ids
+        )
+        .values("ancestor_id", "ancestor__name")
+        .annotate(count=Count("descendant__patterns", distinct=True))
+        .order_by("-count", "ancestor__name")
+    )
+
+    return {
+        "difficulty": [
+            {"value": row["difficulty"], "count": row["count"]} for row in difficulty
+        ],
+        "yarn_types": [
+            {
+                "id": row["yarntype_id"],
+                "name": row["yarntype__name"],
+                "count": row["count"],
+            }
+            for row in yarn_types
+        ],
+        "tags": [
+            {
+                "id": row["patterntag_id"],
+                "name": row["patterntag__name"],
+                "count": row["count"],
+            }
+            for row in tags
+        ],
+        "categories": [
+            {
+                "id": row["ancestor_id"],
+                "name": row["ancestor__name"],
+                "count": row["count"],
+            }
+            for row in categories
+        ],
+    }
+
+
+def get_facets(queryset, filterset_class, query_params) -> dict:
+    key = facets_cache_key(filterset_class, query_params)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, FACETS_TIMEOUT)
+    return facets
@@ -1,7 +1,7 @@
 import django_filters
-from django.db.models import Q
 
 from .models import Pattern, Category
+from .search import get_pattern_search_backend
 
 
 class BasePatternFilter(django_filters.FilterSet):
@@ -18,7 +18,7 @@ class BasePatternFilter(django_filters.FilterSet):
         choices=Pattern.DifficultyChoices.choices,
         label="Difficulty",
     )
-    popular = django_filters.OrderingFilter(fields=(("count_saved", "popular"),), label="Popular")
+    popular = django_filters.OrderingFilter(fields=(("saved_count", "popular"),), label="Popular")
 
     class Meta:
         model = Pattern
@@ -26,15 +26,14 @@ class BasePatternFilter(django_filters.FilterSet):
 
     @staticmethod
     def filter_search(queryset, name, value):
-        return queryset.filter(
-            Q(title__icontains=value) | Q(description__icontains=value)
-        )
+        return get_pattern_search_backend().search(queryset, value)
 
     @staticmethod
     def filter_category(queryset, name, value):
-        return queryset.filter(
-            Q(category__in=Category.objects.get_all_subcategories(value))
+        in_subtree = Pattern.category.through.objects.filter(
+            category__in=Category.objects.get_all_subcategories(value)
         )
+        return queryset.filter(id__in=in_subtree.values("pattern_id"))
 
 
 class PatternFilter(BasePatternFilter):
@@ -0,0 +1,201 @@
+import csv
+import json
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .leaderboard import Leaderboard
+from .models import Category, Material, Pattern, PatternTag, YarnType
+from .search import get_pattern_search_backend
+from .serializers import ImportPatternSerializer
+from .tasks import update_similar_patterns
+from utils.names import bulk_created
+from utils.response_cache import invalidate
+
+LIST_SEPARATOR = "|"
+
+
+def parse_json(value):
+    # invalid JSON is passed on as is and reported by the row validation
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def read_jsonl(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield parse_json(line)
+
+
+def read_csv(stream):
+    # tags, yarn_types and categories are "|" separated names, materials is a
+    # JSON list of {"name", "amount", "unit"} objects
+    for row in csv.DictReader(stream):
+        for column in ("tags", "yarn_types", "categories"):
+            value = row.get(column) or ""
+            row[column] = [name for name in value.split(LIST_SEPARATOR) if name]
+        row["materials"] = parse_json(row.get("materials") or "[]")
+        yield row
+
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv}
+
+
+class ReadError:
+    # takes the place of the row at which the upload stopped being readable
+    def __init__(self, message: str):
+        self.message = message
+
+
+def stop_on_read_error(rows):
+    # the file can't be read past a decoding or CSV error, the rows before it
+    # are imported and the error is reported for the row it happened at
+    try:
+        yield from rows
+    except (UnicodeDecodeError, csv.Error) as exc:
+        yield ReadError(f"The file can't be read from this row on: {exc}")
+
+
+def read_upload(upload, file_format: str = None):
+    if file_format is None:
+        file_format = "csv" if upload.name.lower().endswith(".csv") else "jsonl"
+    # decoded line by line, so a decoding error is reported at its own row
+    lines = (line.decode("utf-8") for line in upload)
+    return stop_on_read_error(READERS[file_format](lines))
+
+
+class PatternImporter:
+    # Validates rows one by one, but resolves tags, yarn types and categories
+    # per chunk and writes every chunk with a handful of bulk inserts inside a
+    # single transaction. Missing tags and yarn types are created, categories
+    # must already exist.
+
+    def __init__(self, author=None, chunk_size: int = 1000):
+        self.author = author
+        self.chunk_size = chunk_size
+        self.created_ids = []
+        self.errors = []
+        self.tags = {}
+        self.yarn_types = {}
+        self.categories = {}
+        # one serializer validates every row, building its fields again for
+        # each row would take longer than the inserts
+        self.serializer = ImportPatternSerializer()
+
+    def run(self, rows) -> dict:
+        chunk = []
+        for number, row in enumerate(rows, start=1):
+            if isinstance(row, ReadError):
+                self.errors.append({"row": number, "errors": {"file": [row.message]}})
+                continue
+            chunk.append((number, row))
+            if len(chunk) == self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        self.import_chunk(chunk)
+
+        if self.created_ids:
+            transaction.on_commit(Leaderboard.invalidate)
+            transaction.on_commit(lambda: invalidate("patterns"))
+            transaction.on_commit(
+                lambda: update_similar_patterns.delay(self.created_ids)
+            )
+        return {"created": len(self.created_ids), "errors": self.errors}
+
+    def import_chunk(self, chunk):
+        valid = []
+        for number, row in chunk:
+            try:
+                valid.append((number, self.serializer.run_validation(row)))
+            except ValidationError as exc:
+                self.errors.append({"row": number, "errors": exc.detail})
+        if not valid:
+            return
+
+        self.resolve(self.tags, PatternTag, valid, "tags", create=True)
+        self.resolve(self.yarn_types, YarnType, valid, "yarn_types", create=True)
+        self.resolve(self.categories, Category, valid, "categories", create=False)
+
+        rows = []
+        for number, data in valid:
+            unknown = [
+                name for name in data["categories"] if name not in self.categories
+            ]
+            if unknown:
+                self.errors.append(
+                    {
+                        "row": number,
+                        "errors": {"categories": [f"Unknown category: {unknown[0]}."]},
+                    }
+                )
+            else:
+                rows.append(data)
+        if rows:
+            with transaction.atomic():
+                patterns = self.insert(rows)
+            transaction.on_commit(lambda: get_pattern_search_backend().update(patterns))
+            # e.g. for the unified search documents
+            bulk_created.send(sender=Pattern, pks=[pattern.pk for pattern in patterns])
+            self.created_ids += [pattern.pk for pattern in patterns]
+
+    @staticmethod
+    def resolve(cache, model, valid, key, create):
+        names = {name for _, data in valid for name in data[key]} - cache.keys()
+        if not names:
+            return
+        if create:
+            cache.update(model.objects.get_or_create_by_name(names))
+        else:
+            cache.update(model.objects.filter(name__in=names).values_list("name", "id"))
+
+    def insert(self, rows):
+        patterns = Pattern.objects.bulk_create(
+            [
+                Pattern(
+                    author=self.author,
+                    title=data["title"],
+                    description=data.get("description", ""),
+                    tips=data.get("tips", ""),
+                    text_pattern=data["text_pattern"],
+                    difficulty=data["difficulty"],
+                    hook_or_needle_size=data["hook_or_needle_size"],
+                )
+                for data in rows
+            ]
+        )
+
+        Tags, YarnTypes, Categories = (
+            Pattern.tag.through,
+            Pattern.yarn_type.through,
+            Pattern.category.through,
+        )
+        tags, yarn_types, categories, materials = [], [], [], []
+        for pattern, data in zip(patterns, rows):
+            tags += [
+                Tags(pattern_id=pattern.pk, patterntag_id=self.tags[name])
+                for name in set(data["tags"])
+            ]
+            yarn_types += [
+                YarnTypes(pattern_id=pattern.pk, yarntype_id=self.yarn_types[name])
+                for name in set(data["yarn_types"])
+            ]
+            categories += [
+                Categories(pattern_id=pattern.pk, category_id=self.categories[name])
+                for name in set(data["categories"])
+            ]
+            materials += [
+                Material(pattern_id=pattern.pk, **material)
+                for material in data["materials"]
+            ]
+
+        for model, objects in (
+            (Tags, tags),
+            (YarnTypes, yarn_types),
+            (Categories, categories),
+            (Material, materials),
+        ):
+            model.objects.bulk_create(objects, batch_size=self.chunk_size)
+        return patterns
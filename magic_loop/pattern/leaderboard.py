@@ -0,0 +1,180 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Pattern
+
+LEADERBOARD_SIZE = 100
+
+
+class Leaderboard:
+    # Top patterns by saved_count, stored in the cache as a list of
+    # [saved_count, pattern_id] pairs sorted in descending order. The list is
+    # adjusted in place on every save/unsave; a full rebuild only happens on a
+    # miss, and only one process rebuilds a given board at a time.
+
+    version_key = "leaderboard:version"
+    # without the shared cache every process keeps its own boards, which never
+    # see the saves handled by the other processes, so they must not live long
+    timeout = 60 * 10 if settings.CACHE_URL else 60
+    lock_timeout = 10
+    lock_wait = 2
+
+    def __init__(self, category_id: int = None, tag_id: int = None):
+        self.category_id = category_id
+        self.tag_id = tag_id
+
+    @property
+    def scope(self) -> str:
+        parts = []
+        if self.category_id:
+            parts.append(f"category:{self.category_id}")
+        if self.tag_id:
+            parts.append(f"tag:{self.tag_id}")
+        return ":".join(parts) or "all"
+
+    @classmethod
+    def get_version(cls) -> int:
+        return cache.get_or_set(cls.version_key, 1, None)
+
+    @classmethod
+    def invalidate(cls):
+        try:
+            cache.incr(cls.version_key)
+        except ValueError:
+            cache.set(cls.version_key, 2, None)
+
+    @property
+    def key(self) -> str:
+        return f"leaderboard:{self.get_version()}:{self.scope}"
+
+    def get_queryset(self):
+        qs = Pattern.objects.all()
+        if self.category_id:
+            in_subtree = Pattern.category.through.objects.filter(
+                category__in=Category.objects.get_all_subcategories(self.category_id)
+            )
+            qs = qs.filter(id__in=in_subtree.values("pattern_id"))
+        if self.tag_id:
+            qs = qs.filter(tag=self.tag_id)
+        return qs.order_by("-saved_count", "-id")
+
+    def build(self) -> dict:
+        entries = [
+            list(entry)
+            for entry in self.get_queryset().values_list("saved_count", "id")[
+                :LEADERBOARD_SIZE
+            ]
+        ]
+        return {
+            "entries": entries,
+            # every matching pattern is on the board
+            "complete": len(entries) < LEADERBOARD_SIZE,
+            "build": uuid.uuid4().hex,
+            "revision": 0,
+        }
+
+    @staticmethod
+    def covers(board, limit: int) -> bool:
+        return board is not None and (
+            board["complete"] or len(board["entries"]) >= limit
+        )
+
+    def get(self, limit: int) -> dict:
+        key = self.key
+        board = cache.get(key)
+        if self.covers(board, limit):
+            return board
+
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                board = self.build()
+                cache.set(key, board, self.timeout)
+                return board
+            finally:
+                cache.delete(lock_key)
+
+        # another request is rebuilding this board, wait for its result
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            board = cache.get(key)
+            if self.covers(board, limit):
+                return board
+        return self.build()
+
+    def update(self, pattern_id: int, saved_count: int):
+        key = self.key
+        if key not in cache:
+            return
+
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, self.lock_timeout):
+            # can't update it safely, let the next reader rebuild it
+            cache.delete(key)
+            return
+        try:
+            board = cache.get(key)
+            if board is not None:
+                self.apply(board, pattern_id, saved_count)
+                cache.set(key, board, self.timeout)
+        finally:
+            cache.delete(lock_key)
+
+    @staticmethod
+    def apply(board, pattern_id: int, saved_count: int):
+        entries = [entry for entry in board["entries"] if entry[1] != pattern_id]
+        was_listed = len(entries) != len(board["entries"])
+        entry = [saved_count, pattern_id]
+
+        # patterns that are not on an incomplete board rank below its last
+        # entry, so the new entry can only be placed if it is above that one
+        if board["complete"] or (entries and entry > entries[-1]):
+            entries.append(entry)
+            entries.sort(reverse=True)
+        elif not was_listed:
+            return
+
+        if len(entries) > LEADERBOARD_SIZE:
+            del entries[LEADERBOARD_SIZE:]
+            board["complete"] = False
+
+        board["entries"] = entries
+        board["revision"] += 1
+
+    @classmethod
+    def record(cls, pattern_ids):
+        patterns = dict(
+            Pattern.objects.filter(pk__in=pattern_ids).values_list("id", "saved_count")
+        )
+        tags = Pattern.tag.through.objects.filter(pattern_id__in=patterns).values_list(
+            "pattern_id", "patterntag_id"
+        )
+        categories = (
+            Category.objects.closure.filter(descendant__patterns__in=patterns)
+            .values_list("descendant__patterns", "ancestor_id")
+            .distinct()
+        )
+
+        tag_ids = {pattern_id: [] for pattern_id in patterns}
+        for pattern_id, tag_id in tags:
+            tag_ids[pattern_id].append(tag_id)
+
+        boards = {
+            pattern_id: [cls(), *(cls(tag_id=tag_id) for tag_id in tag_ids[pattern_id])]
+            for pattern_id in patterns
+        }
+        for pattern_id, category_id in categories:
+            boards[pattern_id].append(cls(category_id=category_id))
+            # the boards filtered by both
+            boards[pattern_id].extend(
+                cls(category_id=category_id, tag_id=tag_id)
+                for tag_id in tag_ids[pattern_id]
+            )
+
+        for pattern_id, saved_count in patterns.items():
+            for board in boards[pattern_id]:
+                board.update(pattern_id, saved_count)
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from pattern.filtersets import BasePatternFilter
+from pattern.models import Category, Pattern
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Build deep and wide synthetic category trees inside a rolled back "
+        "transaction and report the queries needed to filter patterns by "
+        "the root category."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 500])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'tree':<6}{'nodes':>8}{'queries':>10}{'ms':>10}")
+        try:
+            with transaction.atomic():
+                for size in options["sizes"]:
+                    for shape in ("deep", "wide"):
+                        self.report(shape, size)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, shape, size):
+        root = Category.objects.create(name=f"bench-{shape}-{size}")
+        parent = root
+        for i in range(size):
+            node = Category.objects.create(
+                name=f"bench-{shape}-{size}-{i}", parent=parent
+            )
+            if shape == "deep":
+                parent = node
+
+        pattern = Pattern.objects.create(
+            title="bench", difficulty="beginner", hook_or_needle_size=4
+        )
+        pattern.category.add(node)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            patterns = BasePatternFilter(
+                data={"category": root.pk}, queryset=Pattern.objects.all()
+            ).qs
+            assert list(patterns) == [pattern]
+            elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f"{shape:<6}{size + 1:>8}{len(queries):>10}{elapsed:>10.2f}"
+        )
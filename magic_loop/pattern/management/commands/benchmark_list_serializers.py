@@ -0,0 +1,150 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from community.models import Comment, Post, Tag
+from community.views import PostViewSet
+from pattern.models import Category, Pattern, PatternTag
+from pattern.views import PatternViewSet
+from projects.models import Project
+from projects.views import ProjectViewSet
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize pattern, post and project list pages through the DRF "
+        "serializers and through the values based path inside a rolled back "
+        "transaction, check that both render the same JSON and report timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        self.stdout.write(
+            f"{'endpoint':<10}{'rows':>6}{'drf ms':>10}{'drf q':>7}"
+            f"{'values ms':>11}{'values q':>10}{'speedup':>9}  identical"
+        )
+        try:
+            with transaction.atomic():
+                user = self.create_rows(max(options["sizes"]))
+                for name, view_class in (
+                    ("patterns", PatternViewSet),
+                    ("posts", PostViewSet),
+                    ("projects", ProjectViewSet),
+                ):
+                    for size in options["sizes"]:
+                        self.report(name, view_class, user, size)
+                raise Rollback
+        except Rollback:
+            pass
+
+    @staticmethod
+    def create_rows(count):
+        user = get_user_model().objects.create(
+            username="bench-serializers", email="bench-serializers@example.com"
+        )
+        tags = PatternTag.objects.bulk_create(
+            [PatternTag(name=f"bench-tag-{i}") for i in range(20)]
+        )
+        categories = Category.objects.bulk_create(
+            [Category(name=f"bench-category-{i}") for i in range(10)]
+        )
+        patterns = Pattern.objects.bulk_create(
+            [
+                Pattern(
+                    author=user,
+                    title=f"bench pattern {i}",
+                    difficulty="beginner",
+                    hook_or_needle_size=4,
+                    image=f"patterns/images/bench-{i}.jpg" if i % 2 else None,
+                )
+                for i in range(count)
+            ]
+        )
+        Pattern.tag.through.objects.bulk_create(
+            Pattern.tag.through(pattern_id=pattern.pk, patterntag_id=tag.pk)
+            for i, pattern in enumerate(patterns)
+            for tag in tags[i % 20 : i % 20 + 3]
+        )
+        Pattern.category.through.objects.bulk_create(
+            Pattern.category.through(
+                pattern_id=pattern.pk, category_id=categories[i % 10].pk
+            )
+            for i, pattern in enumerate(patterns)
+        )
+
+        post_tags = Tag.objects.bulk_create(
+            [Tag(name=f"bench-tag-{i}") for i in range(10)]
+        )
+        posts = Post.objects.bulk_create(
+            [
+                Post(author=user, title=f"bench post {i}", content="bench")
+                for i in range(count)
+            ]
+        )
+        Post.tag.through.objects.bulk_create(
+            Post.tag.through(post_id=post.pk, tag_id=post_tags[i % 10].pk)
+            for i, post in enumerate(posts)
+        )
+        Post.likes.through.objects.bulk_create(
+            Post.likes.through(post_id=post.pk, user_id=user.pk) for post in posts[::2]
+        )
+        Comment.objects.bulk_create(
+            Comment(author=user, post=post, content="bench")
+            for post in posts
+            for _ in range(2)
+        )
+
+        Project.objects.bulk_create(
+            Project(user=user, name=f"bench project {i}", time_spent=i % 50)
+            for i in range(count)
+        )
+        return user
+
+    def report(self, name, view_class, user, size):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=user)
+        view = view_class(action_map={"get": "list"}, format_kwarg=None, kwargs={})
+        view.request = view.initialize_request(request)
+
+        def drf():
+            page = list(view.get_queryset()[:size])
+            return view.get_serializer(page, many=True).data
+
+        def values():
+            serializer = view.get_values_serializer()
+            return serializer.serialize(
+                serializer.get_queryset(view.get_queryset())[:size]
+            )
+
+        drf_ms, drf_queries, drf_data = self.measure(drf)
+        values_ms, values_queries, values_data = self.measure(values)
+        renderer = JSONRenderer()
+        identical = renderer.render(drf_data) == renderer.render(values_data)
+
+        self.stdout.write(
+            f"{name:<10}{len(drf_data):>6}{drf_ms:>10.2f}{drf_queries:>7}"
+            f"{values_ms:>11.2f}{values_queries:>10}{drf_ms / values_ms:>8.1f}x"
+            f"  {'yes' if identical else 'NO'}"
+        )
+
+    def measure(self, serialize):
+        timings = []
+        for _ in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                data = serialize()
+                timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), len(queries), data
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from pattern.importers import PatternImporter
+from pattern.models import Pattern
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Import synthetic pattern rows inside a rolled back transaction and "
+        "report the throughput, failing below --min-rate rows per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--min-rate", type=float, default=1000)
+
+    def handle(self, *args, **options):
+        rows = self.create_rows(options["rows"])
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                result = PatternImporter(chunk_size=options["chunk_size"]).run(rows)
+                elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+
+        rate = len(rows) / elapsed
+        self.stdout.write(
+            f"{len(rows)} rows, {result['created']} created, "
+            f"{len(result['errors'])} failed in {elapsed:.2f}s: {rate:.0f} rows/s"
+        )
+        if rate < options["min_rate"]:
+            raise CommandError(
+                f"Imported {rate:.0f} rows/s, expected at least "
+                f"{options['min_rate']:.0f}."
+            )
+
+    @staticmethod
+    def create_rows(count):
+        # every tenth row is invalid, errors are part of the work
+        return [
+            {
+                "title": f"bench pattern {i}",
+                "description": "description",
+                "text_pattern": "ch 4, sl st to join",
+                "difficulty": Pattern.DifficultyChoices.BEGINNER,
+                "hook_or_needle_size": -1 if i % 10 == 0 else 4,
+                "tags": [f"bench-tag-{i % 20}", f"bench-tag-{i % 7}"],
+                "yarn_types": [f"bench-yarn-{i % 5}"],
+                "materials": [{"name": "yarn", "amount": 50, "unit": "grams"}],
+            }
+            for i in range(count)
+        ]
@@ -0,0 +1,45 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from pattern.importers import READERS, PatternImporter
+
+
+class Command(BaseCommand):
+    help = "Import patterns with their materials, tags, yarn types and categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSONL or CSV file.")
+        parser.add_argument("--format", choices=list(READERS))
+        parser.add_argument("--author", help="Username of the patterns' author.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        author = None
+        if options["author"]:
+            try:
+                author = get_user_model().objects.get(username=options["author"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['author']!r} does not exist.")
+
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "jsonl"
+        )
+
+        started = time.perf_counter()
+        with open(path, encoding="utf-8", newline="") as stream:
+            result = PatternImporter(
+                author=author, chunk_size=options["chunk_size"]
+            ).run(READERS[file_format](stream))
+        elapsed = time.perf_counter() - started
+
+        for error in result["errors"]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} patterns in {elapsed:.2f}s, "
+                f"{len(result['errors'])} rows failed."
+            )
+        )
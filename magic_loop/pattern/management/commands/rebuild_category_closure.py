@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pattern.models import Category
+
+
+class Command(BaseCommand):
+    help = "Rebuild the category ancestor/descendant closure table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            links = Category.objects.rebuild_closure()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {links} category links."))
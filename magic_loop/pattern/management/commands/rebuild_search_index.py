@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from utils.search import get_search_backend, search_indexes
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search indexes from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            help="Models to reindex, e.g. pattern.pattern (default: all).",
+        )
+
+    def handle(self, *args, **options):
+        labels = options["models"] or list(search_indexes)
+        for label in labels:
+            if label not in search_indexes:
+                raise CommandError(f"No search index registered for {label!r}.")
+            with transaction.atomic():
+                get_search_backend(search_indexes[label]).rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt search index of {label}."))
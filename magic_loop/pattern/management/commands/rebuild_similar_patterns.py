@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pattern.similarity import rebuild_similar_patterns
+
+
+class Command(BaseCommand):
+    help = "Recompute the similar patterns of every pattern."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_similar_patterns()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Computed similar patterns of {count} patterns in "
+                f"{time.perf_counter() - started:.2f}s."
+            )
+        )
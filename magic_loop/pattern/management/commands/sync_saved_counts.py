@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from pattern.leaderboard import Leaderboard
+from pattern.models import Pattern
+from utils.counters import count_subquery
+from utils.response_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = "Recalculate the stored saved_count of every pattern."
+
+    def handle(self, *args, **options):
+        saved = get_user_model().saved_patterns.through.objects.all()
+        updated = Pattern.objects.update(
+            saved_count=count_subquery(saved, "pattern_id")
+        )
+        Leaderboard.invalidate()
+        invalidate(
+            "patterns",
+            *(f"pattern:{pk}" for pk in Pattern.objects.values_list("pk", flat=True)),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Synced saved counts of {updated} patterns.")
+        )
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
 
 
 class CategoryManager(models.Manager):
@@ -6,18 +7,92 @@ class CategoryManager(models.Manager):
     def get_top_categories(self):
         return self.filter(parent=None)
 
-    def get_all_subcategories(self, category_id: int) -> set:
-        category = self.prefetch_related("subcategories").get(id=category_id)
+    def get_all_subcategories(self, category_id: int) -> models.QuerySet:
+        # ids of the category itself and every category below it, read from the
+        # closure table in a single query (usable as a subquery as well)
+        return self.filter(ancestor_links__ancestor_id=category_id).values_list(
+            "id", flat=True
+        )
 
-        result = set()
-        result.add(category_id)
+    @property
+    def closure(self):
+        return self.model.ancestor_links.field.model.objects
 
-        self.__add_subcategories(result, category)
+    def insert_node(self, category):
+        links = [self.closure.model(ancestor=category, descendant=category, depth=0)]
+        if category.parent_id:
+            links += [
+                self.closure.model(
+                    ancestor_id=ancestor_id, descendant=category, depth=depth + 1
+                )
+                for ancestor_id, depth in self.closure.filter(
+                    descendant_id=category.parent_id
+                ).values_list("ancestor_id", "depth")
+            ]
+        self.closure.bulk_create(links)
 
-        return result
+    def move_node(self, category):
+        subtree = dict(
+            self.closure.filter(ancestor_id=category.pk).values_list(
+                "descendant_id", "depth"
+            )
+        )
+        ancestors = self.closure.filter(descendant_id=category.parent_id).values_list(
+            "ancestor_id", "depth"
+        )
 
-    def __add_subcategories(self, result, category_instance):
-        subcategories = category_instance.subcategories.all()
-        for subcategory in subcategories:
-            result.add(subcategory.id)
-            self.__add_subcategories(result, subcategory)
+        with transaction.atomic():
+            self.closure.filter(descendant_id__in=subtree).exclude(
+                ancestor_id__in=subtree
+            ).delete()
+            self.closure.bulk_create(
+                self.closure.model(
+                    ancestor_id=ancestor_id,
+                    descendant_id=descendant_id,
+                    depth=ancestor_depth + descendant_depth + 1,
+                )
+                for ancestor_id, ancestor_depth in ancestors
+                for descendant_id, descendant_depth in subtree.items()
+            )
+
+    def detach_subcategories(self, category):
+        # children of a deleted category become top level categories (SET_NULL),
+        # so their subtrees lose every ancestor above them
+        subtree = self.closure.filter(ancestor_id=category.pk, depth__gt=0).values(
+            "descendant_id"
+        )
+        ancestors = self.closure.filter(descendant_id=category.pk).values("ancestor_id")
+        self.closure.filter(
+            descendant_id__in=subtree, ancestor_id__in=ancestors
+        ).delete()
+
+    def rebuild_closure(self):
+        parents = dict(self.values_list("id", "parent_id"))
+
+        links = []
+        for category_id in parents:
+            ancestor_id, depth, seen = category_id, 0, set()
+            while ancestor_id is not None and ancestor_id not in seen:
+                seen.add(ancestor_id)
+                links.append(
+                    self.closure.model(
+                        ancestor_id=ancestor_id, descendant_id=category_id, depth=depth
+                    )
+                )
+                ancestor_id, depth = parents[ancestor_id], depth + 1
+
+        self.closure.all().delete()
+        self.closure.bulk_create(links, batch_size=1000)
+        return len(links)
+
+
+class PatternQuerySet(models.QuerySet):
+
+    def annotate_is_saved(self, user):
+        # a single EXISTS per row instead of loading everyone who saved it
+        if not user.is_authenticated:
+            return self
+        saved = self.model.saved.through.objects.filter(
+            pattern_id=OuterRef("pk"), user_id=user.pk
+        )
+        return self.annotate(is_saved=Exists(saved))
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:46
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_saved_count(apps, schema_editor):
+    Pattern = apps.get_model("pattern", "Pattern")
+    SavedPatterns = apps.get_model("user", "User").saved_patterns.through
+
+    saved = (
+        SavedPatterns.objects.filter(pattern_id=OuterRef("pk"))
+        .order_by()
+        .values("pattern_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    Pattern.objects.update(
+        saved_count=Coalesce(Subquery(saved, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0003_alter_material_unit"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pattern",
+            name="saved_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_saved_count, migrations.RunPython.noop),
+    ]
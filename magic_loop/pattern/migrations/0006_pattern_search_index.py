@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:02
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS pattern_pattern_fts USING fts5("
+        "title, description, tips, text_pattern, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO pattern_pattern_fts "
+        "(rowid, title, description, tips, text_pattern) "
+        "SELECT id, title, description, tips, COALESCE(text_pattern, '') "
+        "FROM pattern_pattern"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS pattern_pattern_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0005_categoryclosure"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0006_pattern_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pattern",
+            index=models.Index(
+                fields=["saved_count", "id"], name="pattern_pat_saved_c_4f8ed6_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0007_pattern_saved_count_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="pattern",
+            index=models.Index(
+                fields=["created_at", "id"], name="pattern_pat_created_961767_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0008_pattern_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pattern",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
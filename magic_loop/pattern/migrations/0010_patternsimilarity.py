@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0009_pattern_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PatternSimilarity",
+            fields=[
+                (
+                    "pattern",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="similarity",
+                        serialize=False,
+                        to="pattern.pattern",
+                    ),
+                ),
+                ("neighbors", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
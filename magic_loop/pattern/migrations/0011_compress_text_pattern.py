@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:10
+
+from django.db import migrations
+
+import utils.fields
+
+BATCH_SIZE = 500
+
+
+def text_patterns(apps):
+    Pattern = apps.get_model("pattern", "Pattern")
+    rows = Pattern.objects.exclude(text_pattern=None).order_by("pk")
+    last = 0
+    while batch := list(
+        rows.filter(pk__gt=last).values_list("pk", "text_pattern")[:BATCH_SIZE]
+    ):
+        yield from batch
+        last = batch[-1][0]
+
+
+def compress_text_patterns(apps, schema_editor):
+    # existing rows still hold plain text, the field reads it as is and
+    # writes it back compressed
+    Pattern = apps.get_model("pattern", "Pattern")
+    for pk, text_pattern in text_patterns(apps):
+        Pattern.objects.filter(pk=pk).update(text_pattern=text_pattern)
+
+
+def decompress_text_patterns(apps, schema_editor):
+    table = apps.get_model("pattern", "Pattern")._meta.db_table
+    with schema_editor.connection.cursor() as cursor:
+        for pk, text_pattern in text_patterns(apps):
+            cursor.execute(
+                f"UPDATE {table} SET text_pattern = %s WHERE id = %s",
+                [text_pattern, pk],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pattern", "0010_patternsimilarity"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pattern",
+            name="text_pattern",
+            field=utils.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_text_patterns, decompress_text_patterns),
+    ]
@@ -1,8 +1,11 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 
-from .managers import CategoryManager
+from .managers import CategoryManager, PatternQuerySet
+from utils.fields import CompressedTextField
+from utils.names import NamedManager
 
 
 class Category(models.Model):
@@ -17,13 +20,47 @@ class Category(models.Model):
     )
     objects = CategoryManager()
 
+    def clean(self):
+        if (
+            self.pk
+            and self.parent_id
+            and Category.objects.get_all_subcategories(self.pk)
+            .filter(id=self.parent_id)
+            .exists()
+        ):
+            raise ValidationError(
+                {"parent": "A category can't be moved under its own subcategory."}
+            )
+
     def __str__(self):
         return self.name
 
 
+class CategoryClosure(models.Model):
+    ancestor = models.ForeignKey(
+        to=Category, on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        to=Category, on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="unique_category_closure"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
 class PatternTag(models.Model):
     name = models.CharField(max_length=255, unique=True)
 
+    objects = NamedManager()
+
     def __str__(self):
         return self.name
 
@@ -31,6 +68,8 @@ class PatternTag(models.Model):
 class YarnType(models.Model):
     name = models.CharField(max_length=255, unique=True)
 
+    objects = NamedManager()
+
     def __str__(self):
         return self.name
 
@@ -51,8 +90,9 @@ class Pattern(models.Model):
     description = models.TextField(blank=True)
     tips = models.TextField(blank=True)
     image = models.ImageField(upload_to="patterns/images/", blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     file = models.FileField(upload_to="patterns/files/", blank=True, null=True)
-    text_pattern = models.TextField(blank=True, null=True)
+    text_pattern = CompressedTextField(blank=True, null=True)
     difficulty = models.CharField(max_length=20, choices=DifficultyChoices.choices)
     yarn_type = models.ManyToManyField(to=YarnType, related_name="patterns", blank=True)
     hook_or_needle_size = models.DecimalField(
@@ -61,15 +101,34 @@ class Pattern(models.Model):
     category = models.ManyToManyField(to=Category, related_name="patterns", blank=True)
     tag = models.ManyToManyField(to=PatternTag)
     created_at = models.DateTimeField(auto_now_add=True)
+    saved_count = models.PositiveIntegerField(default=0, editable=False)
+    objects = PatternQuerySet.as_manager()
 
-    @property
-    def saved_count(self) -> int:
-        return self.saved.count()
+    class Meta:
+        indexes = [
+            models.Index(fields=["saved_count", "id"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class PatternSimilarity(models.Model):
+    # the most similar patterns as [pattern_id, score] pairs, best first
+    pattern = models.OneToOneField(
+        to=Pattern,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="similarity",
+    )
+    neighbors = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.pattern_id}"
+
+
 class Material(models.Model):
     class UnitChoices(models.TextChoices):
         GRAMS = "grams", "Grams"
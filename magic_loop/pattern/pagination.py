@@ -1,5 +1,191 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ValidationError as DjangoValidationError,
+)
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    # Cursor pagination over the full ordering of the queryset, e.g.
+    # (-created_at, -id) or (-saved_count, -id). The cursor holds the values of
+    # the last row of the page, so every page is a range scan without OFFSET
+    # and no COUNT(*) is needed.
+    page_size_query_param = "page_size"
+    ordering = ("-pk",)
+    unsupported_ordering_message = (
+        "Cursor pagination is not available for this ordering."
+    )
+
+    def get_ordering(self, request, queryset, view):
+        if queryset.query.extra_order_by:
+            raise ValidationError({"pagination": self.unsupported_ordering_message})
+
+        ordering = list(queryset.query.order_by) or list(
+            getattr(view, "cursor_ordering", self.ordering)
+        )
+        opts = queryset.model._meta
+        self.fields = []
+        for order in ordering:
+            name = order.lstrip("-") if isinstance(order, str) else None
+            try:
+                field = opts.pk if name == "pk" else opts.get_field(name)
+            except (FieldDoesNotExist, TypeError):
+                field = None
+            if field is None or field.null or not field.concrete:
+                raise ValidationError({"pagination": self.unsupported_ordering_message})
+            self.fields.append(field)
+
+        if not self.fields[-1].primary_key:
+            ordering.append("-pk" if ordering[-1].startswith("-") else "pk")
+            self.fields.append(opts.pk)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        return self.get_page(queryset)
+
+    def paginate_first_page(self, queryset, request, url: str, view=None):
+        # for a first page embedded in another response, the links point to the
+        # listing at url and the request's own query params are not read
+        self.request = request
+        self.base_url = request.build_absolute_uri(url)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = None
+        return self.get_page(queryset)
+
+    def get_page(self, queryset):
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(ordering))
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > len(self.page)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = bool(self.page), has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None and bool(self.page)
+
+        if self.page:
+            self.previous_position = self.get_position(self.page[0])
+            self.next_position = self.get_position(self.page[-1])
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_keyset_filter(self, ordering):
+        position = self.cursor.position
+
+        query = Q()
+        for index, order in enumerate(ordering):
+            lookup = "lt" if order.startswith("-") else "gt"
+            condition = Q(**{f"{order.lstrip('-')}__{lookup}": position[index]})
+            for previous, value in zip(ordering[:index], position):
+                condition &= Q(**{previous.lstrip("-"): value})
+            query |= condition
+
+        # a plain range on the leading column lets the database use its index
+        first = ordering[0]
+        lookup = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{lookup}": position[0]}) & query
+
+    def get_position(self, instance) -> list:
+        return [
+            (
+                instance[field.attname]
+                if isinstance(instance, dict)
+                else getattr(instance, field.attname)
+            )
+            for field in self.fields
+        ]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            reverse, position = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if len(position) != len(self.fields):
+                raise ValueError
+            position = [
+                field.to_python(value) for field, value in zip(self.fields, position)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=bool(reverse), position=position)
+
+    def encode_cursor(self, cursor):
+        # str() keeps the full precision of datetimes and decimals
+        payload = json.dumps([int(cursor.reverse), cursor.position], default=str)
+        encoded = urlsafe_b64encode(payload.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
+    # ?pagination=cursor switches a listing to keyset pagination
+    mode_query_param = "pagination"
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or KeysetPagination.cursor_query_param in request.query_params
+        ):
+            self.keyset = KeysetPagination()
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
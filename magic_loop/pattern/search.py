@@ -0,0 +1,11 @@
+from utils.search import SearchIndex, get_search_backend
+from .models import Pattern
+
+pattern_index = SearchIndex(
+    Pattern,
+    {"title": 10.0, "description": 4.0, "tips": 2.0, "text_pattern": 1.0},
+)
+
+
+def get_pattern_search_backend():
+    return get_search_backend(pattern_index)
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 
+from .leaderboard import LEADERBOARD_SIZE
 from .models import PatternTag, Category, Pattern, Material, YarnType
+from .similarity import SIMILAR_PATTERNS_COUNT
+from utils.images import ImageVariantsField
+from utils.names import NamesField
 
 
 class PatternTagSerializer(serializers.ModelSerializer):
@@ -44,6 +48,7 @@ class PatternDetailSerializer(serializers.ModelSerializer):
     categories = DetailCategorySerializer(source="category", many=True, read_only=True)
     materials = MaterialSerializer(many=True, read_only=True)
     yarn_types = YarnTypeSerializer(source="yarn_type", many=True, read_only=True)
+    is_saved = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Pattern
@@ -59,6 +64,7 @@ class PatternDetailSerializer(serializers.ModelSerializer):
             "yarn_types",
             "hook_or_needle_size",
             "saved_count",
+            "is_saved",
             "created_at",
             "tags",
             "categories",
@@ -69,6 +75,8 @@ class PatternDetailSerializer(serializers.ModelSerializer):
 class PatternSerializer(serializers.ModelSerializer):
     tags = PatternTagSerializer(source="tag", many=True, read_only=True)
     categories = CategorySerializer(source="category", many=True, read_only=True)
+    is_saved = serializers.BooleanField(read_only=True, default=False)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Pattern
@@ -77,14 +85,19 @@ class PatternSerializer(serializers.ModelSerializer):
             "author",
             "title",
             "image",
+            "image_variants",
             "difficulty",
             "saved_count",
+            "is_saved",
             "tags",
             "categories",
         ]
 
 
 class AddPatternSerializer(serializers.ModelSerializer):
+    # tags are given by id, by name or both, missing names are created
+    tag_names = NamesField(required=False, write_only=True)
+
     class Meta:
         model = Pattern
         fields = [
@@ -98,7 +111,9 @@ class AddPatternSerializer(serializers.ModelSerializer):
             "hook_or_needle_size",
             "category",
             "tag",
+            "tag_names",
         ]
+        extra_kwargs = {"tag": {"required": False}}
 
     def validate(self, data):
         if not data.get("file") and not data.get("text_pattern"):
@@ -106,6 +121,11 @@ class AddPatternSerializer(serializers.ModelSerializer):
                 "You must provide either a file or a text pattern."
             )
 
+        if not data.get("tag") and not data.get("tag_names"):
+            raise serializers.ValidationError(
+                {"tag": "Provide at least one tag id or tag name."}
+            )
+
         if data.get("hook_or_needle_size") and data["hook_or_needle_size"] <= 0:
             raise serializers.ValidationError(
                 {
@@ -115,3 +135,62 @@ class AddPatternSerializer(serializers.ModelSerializer):
             )
 
         return data
+
+    def create(self, validated_data):
+        names = validated_data.pop("tag_names", [])
+        if names:
+            tag_ids = PatternTag.objects.get_or_create_by_name(names)
+            validated_data["tag"] = [*validated_data.get("tag", []), *tag_ids.values()]
+        return super().create(validated_data)
+
+
+class PopularPatternsQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1, max_value=LEADERBOARD_SIZE, default=15
+    )
+    category = serializers.IntegerField(required=False)
+    tag_id = serializers.IntegerField(required=False)
+
+
+class SimilarPatternsQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1, max_value=SIMILAR_PATTERNS_COUNT, default=10
+    )
+
+
+class ImportMaterialSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Material
+        fields = ["name", "amount", "unit"]
+
+
+class ImportPatternSerializer(serializers.ModelSerializer):
+    tags = NamesField(allow_empty=False)
+    yarn_types = NamesField(required=False, default=list)
+    categories = serializers.ListField(
+        child=serializers.CharField(max_length=100), required=False, default=list
+    )
+    materials = ImportMaterialSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = Pattern
+        fields = [
+            "title",
+            "description",
+            "tips",
+            "text_pattern",
+            "difficulty",
+            "hook_or_needle_size",
+            "tags",
+            "yarn_types",
+            "categories",
+            "materials",
+        ]
+        extra_kwargs = {"text_pattern": {"required": True, "allow_blank": False}}
+
+    def validate_hook_or_needle_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError(
+                "Crochet hook or Knitting needle size must be positive."
+            )
+        return value
@@ -0,0 +1,194 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .leaderboard import Leaderboard
+from .models import Category, Material, Pattern, PatternTag, YarnType
+from .search import get_pattern_search_backend
+from .tasks import generate_pattern_image_variants
+from utils.images import image_variants_outdated
+from utils.response_cache import changed_m2m_ids, invalidate
+
+SavedPatterns = get_user_model().saved_patterns.through
+
+
+def invalidate_patterns(pattern_ids):
+    tags = ["patterns", *(f"pattern:{pk}" for pk in pattern_ids)]
+    transaction.on_commit(lambda: invalidate(*tags))
+
+
+def _update_saved_count(pattern_ids, delta: int, user_ids):
+    if pattern_ids and delta:
+        Pattern.objects.filter(pk__in=pattern_ids).update(
+            saved_count=F("saved_count") + delta
+        )
+        transaction.on_commit(lambda: Leaderboard.record(pattern_ids))
+        # not the "patterns" tag, every save would drop all the cached lists;
+        # only the savers see their is_saved flags change at once, the counts
+        # in the other users' lists catch up when their entries expire
+        tags = [
+            *(f"pattern:{pk}" for pk in pattern_ids),
+            *(f"saved:{pk}" for pk in user_ids),
+        ]
+        transaction.on_commit(lambda: invalidate(*tags))
+
+
+@receiver(m2m_changed, sender=SavedPatterns)
+def update_saved_count(sender, instance, action, reverse, pk_set, **kwargs):
+    # Django sends these inside the transaction that changes the relation,
+    # so the counter moves atomically with it, from either side of the M2M.
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set for removals holds the requested ids, not the existing ones,
+        # so remember which rows are really going away before they are deleted.
+        if reverse:
+            rows = sender.objects.filter(pattern_id=instance.pk)
+            if pk_set is not None:
+                rows = rows.filter(user_id__in=pk_set)
+            instance._removed_saves = list(rows.values_list("user_id", flat=True))
+        else:
+            rows = sender.objects.filter(user_id=instance.pk)
+            if pk_set is not None:
+                rows = rows.filter(pattern_id__in=pk_set)
+            instance._removed_saves = set(rows.values_list("pattern_id", flat=True))
+        return
+
+    if action == "post_add":
+        if reverse:
+            _update_saved_count([instance.pk], len(pk_set), pk_set)
+        else:
+            _update_saved_count(pk_set, 1, [instance.pk])
+
+    elif action in ("post_remove", "post_clear"):
+        removed = getattr(instance, "_removed_saves", None) or []
+        instance._removed_saves = None
+        if reverse:
+            _update_saved_count([instance.pk], -len(removed), removed)
+        else:
+            _update_saved_count(removed, -1, [instance.pk])
+
+
+@receiver(pre_delete, sender=get_user_model())
+def clear_saved_patterns(sender, instance, **kwargs):
+    # the cascade would delete the saves without sending m2m_changed
+    instance.saved_patterns.clear()
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_parent(sender, instance, raw, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_parent_id = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list("parent_id", flat=True)
+        .first()
+    )
+    if (
+        instance.parent_id
+        and instance.parent_id != instance._previous_parent_id
+        and Category.objects.get_all_subcategories(instance.pk)
+        .filter(id=instance.parent_id)
+        .exists()
+    ):
+        raise ValueError("A category can't be moved under its own subcategory.")
+
+
+@receiver(post_save, sender=Category)
+def update_category_closure(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        Category.objects.insert_node(instance)
+    elif instance.parent_id != getattr(instance, "_previous_parent_id", None):
+        Category.objects.move_node(instance)
+        transaction.on_commit(Leaderboard.invalidate)
+
+
+@receiver(pre_delete, sender=Category)
+def detach_category_subtree(sender, instance, **kwargs):
+    Category.objects.detach_subcategories(instance)
+    transaction.on_commit(Leaderboard.invalidate)
+
+
+@receiver(post_save, sender=Pattern)
+def index_pattern(sender, instance, raw, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: get_pattern_search_backend().update([instance]))
+
+
+@receiver(post_save, sender=Pattern)
+def invalidate_leaderboards(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        transaction.on_commit(Leaderboard.invalidate)
+
+
+@receiver(post_delete, sender=Pattern)
+def unindex_pattern(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_pattern_search_backend().remove([pk]))
+    transaction.on_commit(Leaderboard.invalidate)
+
+
+@receiver(m2m_changed, sender=Pattern.tag.through)
+@receiver(m2m_changed, sender=Pattern.category.through)
+def invalidate_scoped_leaderboards(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(Leaderboard.invalidate)
+
+
+@receiver(post_save, sender=Pattern)
+def schedule_image_variants(sender, instance, raw, **kwargs):
+    if not raw and image_variants_outdated(instance):
+        transaction.on_commit(
+            lambda: generate_pattern_image_variants.delay(instance.pk)
+        )
+
+
+@receiver(post_save, sender=Pattern)
+@receiver(post_delete, sender=Pattern)
+def invalidate_pattern_responses(sender, instance, **kwargs):
+    invalidate_patterns([instance.pk])
+
+
+@receiver(m2m_changed, sender=Pattern.tag.through)
+@receiver(m2m_changed, sender=Pattern.category.through)
+@receiver(m2m_changed, sender=Pattern.yarn_type.through)
+def invalidate_pattern_relation_responses(sender, **kwargs):
+    field = next(
+        field
+        for field in Pattern._meta.many_to_many
+        if field.remote_field.through is sender
+    )
+    pattern_ids = changed_m2m_ids(sender, field=field, **kwargs)
+    if pattern_ids:
+        invalidate_patterns(pattern_ids)
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+def invalidate_material_responses(sender, instance, **kwargs):
+    tag = f"pattern:{instance.pattern_id}"
+    transaction.on_commit(lambda: invalidate(tag))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, **kwargs):
+    # pattern lists and details embed categories and filter by the tree
+    transaction.on_commit(lambda: invalidate("categories"))
+
+
+@receiver(post_save, sender=PatternTag)
+@receiver(post_delete, sender=PatternTag)
+@receiver(post_save, sender=YarnType)
+@receiver(post_delete, sender=YarnType)
+def invalidate_name_responses(sender, **kwargs):
+    # pattern lists, details and facets embed the tag and yarn type names
+    transaction.on_commit(lambda: invalidate("pattern-names"))
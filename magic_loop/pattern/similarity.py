@@ -0,0 +1,290 @@
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from scipy import sparse
+
+from .models import CategoryClosure, Pattern, PatternSimilarity
+
+SIMILAR_PATTERNS_COUNT = 20
+BATCH_SIZE = 500
+# scores are dense, rows times the patterns they are scored against, batches
+# are sized to stay below this many cells (16MB of float64)
+MAX_SCORE_CELLS = 2_000_000
+HOOK_SIZE_STEP = 0.5
+
+# relative importance of the feature groups, every group is normalized on its
+# own first so a pattern with many tags doesn't outweigh everything else
+FEATURE_WEIGHTS = {
+    "tags": 3.0,
+    "categories": 2.0,
+    "yarn_types": 1.0,
+    "difficulty": 1.0,
+    "hook_size": 1.0,
+}
+
+
+class PatternVectors:
+    # Patterns encoded as rows of a sparse matrix whose rows have unit length,
+    # so the cosine similarity of two patterns is the dot product of their rows.
+    # Every row only depends on its own pattern, so the vectors of a subset of
+    # the patterns score the same as those of all of them.
+
+    def __init__(self, patterns=None):
+        # patterns is a queryset limiting the patterns, all of them by default
+        self.patterns = patterns
+        self.ids = np.fromiter(
+            self.limit(Pattern.objects.order_by("pk"), "pk").values_list(
+                "pk", flat=True
+            ),
+            dtype=np.int64,
+        )
+        self.rows = {pk: row for row, pk in enumerate(self.ids.tolist())}
+
+        groups = [
+            (FEATURE_WEIGHTS["tags"], self.relation(Pattern.tag.through, "patterntag")),
+            (FEATURE_WEIGHTS["categories"], self.categories()),
+            (
+                FEATURE_WEIGHTS["yarn_types"],
+                self.relation(Pattern.yarn_type.through, "yarntype"),
+            ),
+            (FEATURE_WEIGHTS["difficulty"], self.difficulty()),
+            (FEATURE_WEIGHTS["hook_size"], self.hook_size()),
+        ]
+        matrix = sparse.hstack(
+            [self.normalize(group) * np.sqrt(weight) for weight, group in groups],
+            format="csr",
+        )
+        self.matrix = self.normalize(matrix)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def limit(self, queryset, field: str = "pattern_id"):
+        if self.patterns is None:
+            return queryset
+        return queryset.filter(**{f"{field}__in": self.patterns.values("pk")})
+
+    def group(self, entries):
+        # entries are (pattern_id, feature, value), features are any hashables
+        rows, columns, values, features = [], [], [], {}
+        for pattern_id, feature, value in entries:
+            if pattern_id in self.rows:
+                rows.append(self.rows[pattern_id])
+                columns.append(features.setdefault(feature, len(features)))
+                values.append(value)
+        return sparse.csr_matrix(
+            (values, (rows, columns)), shape=(len(self), max(len(features), 1))
+        )
+
+    def relation(self, through, target):
+        return self.group(
+            (pattern_id, target_id, 1.0)
+            for pattern_id, target_id in self.limit(through.objects).values_list(
+                "pattern_id", f"{target}_id"
+            )
+        )
+
+    def categories(self):
+        # a category also counts towards its ancestors, less the further up
+        ancestors = {}
+        for descendant_id, ancestor_id, depth in CategoryClosure.objects.values_list(
+            "descendant_id", "ancestor_id", "depth"
+        ):
+            ancestors.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+        return self.group(
+            (pattern_id, ancestor_id, 1.0 / (1 + depth))
+            for pattern_id, category_id in self.limit(
+                Pattern.category.through.objects
+            ).values_list("pattern_id", "category_id")
+            for ancestor_id, depth in ancestors.get(category_id, [(category_id, 0)])
+        )
+
+    def difficulty(self):
+        levels = {
+            value: level for level, value in enumerate(Pattern.DifficultyChoices.values)
+        }
+        return self.group(
+            self.ordinal(pattern_id, levels[difficulty])
+            for pattern_id, difficulty in self.limit(Pattern.objects, "pk").values_list(
+                "pk", "difficulty"
+            )
+            if difficulty in levels
+        )
+
+    def hook_size(self):
+        return self.group(
+            self.ordinal(pattern_id, round(float(size) / HOOK_SIZE_STEP))
+            for pattern_id, size in self.limit(Pattern.objects, "pk").values_list(
+                "pk", "hook_or_needle_size"
+            )
+            if size is not None
+        )
+
+    @staticmethod
+    def ordinal(pattern_id, position):
+        # neighbouring values share part of the weight, so 4mm is still close
+        # to 4.5mm and beginner to intermediate
+        yield from (
+            (pattern_id, position, 1.0),
+            (pattern_id, position - 1, 0.5),
+            (pattern_id, position + 1, 0.5),
+        )
+
+    @staticmethod
+    def normalize(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+    @staticmethod
+    def batch_size(columns: int) -> int:
+        # rows to score at once against the given number of patterns
+        return max(1, min(BATCH_SIZE, MAX_SCORE_CELLS // max(columns, 1)))
+
+    def batches(self, rows):
+        step = self.batch_size(len(self))
+        for start in range(0, len(rows), step):
+            yield rows[start : start + step]
+
+    def scores(self, rows, columns=None):
+        # similarity of the given rows to the patterns at columns, every
+        # pattern but themselves by default, rounded so that ties are ties
+        # everywhere the scores are compared
+        if columns is not None:
+            return (self.matrix[rows] @ self.matrix[columns].T).toarray().round(6)
+        scores = (self.matrix[rows] @ self.matrix.T).toarray().round(6)
+        scores[np.arange(len(rows)), rows] = 0
+        return scores
+
+    def neighbors(self, scores, count: int = SIMILAR_PATTERNS_COUNT) -> list:
+        count = min(count, scores.shape[1] - 1)
+        if count <= 0:
+            return [[] for _ in scores]
+
+        thresholds = np.partition(scores, -count, axis=1)[:, -count]
+        result = []
+        for row, threshold in zip(scores, thresholds):
+            columns = np.flatnonzero((row >= threshold) & (row > 0))
+            # best first, ties by the newer pattern
+            columns = columns[np.lexsort((-self.ids[columns], -row[columns]))][:count]
+            result.append(
+                [[int(self.ids[column]), float(row[column])] for column in columns]
+            )
+        return result
+
+
+def save_neighbors(neighbors: dict):
+    PatternSimilarity.objects.bulk_create(
+        [
+            PatternSimilarity(pattern_id=pattern_id, neighbors=pattern_neighbors)
+            for pattern_id, pattern_neighbors in neighbors.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["pattern"],
+        update_fields=["neighbors", "updated_at"],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def rebuild_similar_patterns() -> int:
+    vectors = PatternVectors()
+    for rows in vectors.batches(np.arange(len(vectors))):
+        with transaction.atomic():
+            save_neighbors(
+                dict(
+                    zip(
+                        vectors.ids[rows].tolist(),
+                        vectors.neighbors(vectors.scores(rows)),
+                    )
+                )
+            )
+    PatternSimilarity.objects.exclude(pattern_id__in=vectors.ids.tolist()).delete()
+    return len(vectors)
+
+
+def related_patterns(pattern_ids):
+    # the patterns and those sharing a tag, yarn type or category with them,
+    # the others only share the difficulty and hook size features and can't
+    # score high enough to make it into the neighbors
+    related = Q(pk__in=pattern_ids)
+    for through, field in (
+        (Pattern.tag.through, "patterntag_id"),
+        (Pattern.yarn_type.through, "yarntype_id"),
+        (Pattern.category.through, "category_id"),
+    ):
+        shared = through.objects.filter(pattern_id__in=pattern_ids).values(field)
+        related |= Q(
+            pk__in=through.objects.filter(**{f"{field}__in": shared}).values(
+                "pattern_id"
+            )
+        )
+    return Pattern.objects.filter(related)
+
+
+def update_similar_patterns(pattern_ids) -> int:
+    # Computes the neighbors of new patterns among their related patterns and
+    # merges them into the lists of those, without loading every pattern. Only
+    # the lists that change are locked and written. Similarities that drop to
+    # zero elsewhere, and unrelated patterns that make it into the neighbors
+    # after all, are left to the next rebuild.
+    if len(pattern_ids) > BATCH_SIZE:
+        return rebuild_similar_patterns()
+
+    vectors = PatternVectors(related_patterns(pattern_ids))
+    rows = np.array(
+        [vectors.rows[pk] for pk in pattern_ids if pk in vectors.rows], dtype=np.int64
+    )
+    if not len(rows):
+        return 0
+
+    new_ids = vectors.ids[rows].tolist()
+    changed = {}
+    for batch in vectors.batches(rows):
+        changed.update(
+            zip(
+                vectors.ids[batch].tolist(),
+                vectors.neighbors(vectors.scores(batch)),
+            )
+        )
+
+    def merge(similarities):
+        # (pattern_id, neighbors, merged neighbors) with the new patterns,
+        # scored against those only
+        similarities = list(similarities)
+        scores = vectors.scores([vectors.rows[pk] for pk, _ in similarities], rows)
+        for (pattern_id, neighbors), new_scores in zip(similarities, scores):
+            entries = dict(neighbors)
+            entries.update(zip(new_ids, new_scores.tolist()))
+            merged = sorted(
+                ([pk, score] for pk, score in entries.items() if score > 0),
+                key=lambda entry: (-entry[1], -entry[0]),
+            )[:SIMILAR_PATTERNS_COUNT]
+            yield pattern_id, neighbors, merged
+
+    existing = list(
+        PatternSimilarity.objects.filter(pattern__in=vectors.patterns.values("pk"))
+        .exclude(pattern_id__in=new_ids)
+        .values_list("pattern_id", "neighbors")
+    )
+    step = min(BATCH_SIZE, vectors.batch_size(len(rows)))
+    stale = [
+        pattern_id
+        for start in range(0, len(existing), step)
+        for pattern_id, neighbors, merged in merge(existing[start : start + step])
+        if merged != neighbors
+    ]
+
+    with transaction.atomic():
+        # merged again once locked, another update may have changed them since
+        for start in range(0, len(stale), step):
+            locked = PatternSimilarity.objects.select_for_update().filter(
+                pattern_id__in=stale[start : start + step]
+            )
+            for pattern_id, neighbors, merged in merge(
+                locked.values_list("pattern_id", "neighbors")
+            ):
+                if merged != neighbors:
+                    changed[pattern_id] = merged
+        save_neighbors(changed)
+    return len(rows)
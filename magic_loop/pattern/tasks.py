@@ -2,6 +2,11 @@ from celery import shared_task
 from django.conf import settings
 from django.core.mail import send_mail
 
+from utils.images import update_image_variants
+from utils.response_cache import invalidate
+from . import similarity
+from .models import Pattern
+
 
 @shared_task
 def send_pattern_saved_email(
@@ -19,3 +24,19 @@ def send_pattern_saved_email(
         from_email=settings.EMAIL_HOST_USER,
         recipient_list=[user_email],
     )
+
+
+@shared_task
+def generate_pattern_image_variants(pattern_id: int):
+    update_image_variants(Pattern, pattern_id)
+    invalidate("patterns", f"pattern:{pattern_id}")
+
+
+@shared_task
+def rebuild_similar_patterns():
+    return similarity.rebuild_similar_patterns()
+
+
+@shared_task
+def update_similar_patterns(pattern_ids: list):
+    return similarity.update_similar_patterns(pattern_ids)
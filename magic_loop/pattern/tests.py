@@ -0,0 +1,141 @@
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from magic_loop.celery import app
+from .models import Pattern, PatternTag
+
+
+class IsSavedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create(username="reader", email="reader@example.com")
+        self.patterns = [
+            Pattern.objects.create(
+                author=self.user,
+                title=f"pattern {i}",
+                difficulty=Pattern.DifficultyChoices.BEGINNER,
+                hook_or_needle_size=4,
+            )
+            for i in range(5)
+        ]
+        self.user.saved_patterns.add(self.patterns[1], self.patterns[3])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_savers(self, count: int):
+        User = get_user_model()
+        offset = User.objects.count()
+        savers = User.objects.bulk_create(
+            User(username=f"saver{i}", email=f"saver{i}@example.com")
+            for i in range(offset, offset + count)
+        )
+        Pattern.saved.through.objects.bulk_create(
+            Pattern.saved.through(user_id=saver.pk, pattern_id=pattern.pk)
+            for saver in savers
+            for pattern in self.patterns
+        )
+
+    def list_patterns(self) -> dict:
+        # past the response cache, it would hide the queries
+        cache.clear()
+        response = self.client.get(reverse("patterns:patterns-list"))
+        self.assertEqual(response.status_code, 200)
+        return {row["id"]: row["is_saved"] for row in response.data["results"]}
+
+    def peak_memory(self) -> int:
+        tracemalloc.start()
+        try:
+            self.list_patterns()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_is_saved_memory_does_not_grow_with_savers(self):
+        self.add_savers(2)
+        self.list_patterns()
+        small = self.peak_memory()
+
+        # the savers' rows alone would take far more than the margin
+        self.add_savers(2000)
+        self.assertLess(self.peak_memory(), small * 1.5)
+
+    def test_is_saved_without_loading_savers(self):
+        self.add_savers(2)
+        with CaptureQueriesContext(connection) as queries:
+            self.list_patterns()
+
+        self.add_savers(50)
+        with self.assertNumQueries(len(queries)):
+            is_saved = self.list_patterns()
+
+        self.assertEqual(
+            is_saved,
+            {
+                pattern.pk: pattern in (self.patterns[1], self.patterns[3])
+                for pattern in self.patterns
+            },
+        )
+
+
+@override_settings(RESPONSE_CACHE=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # a renamed tag also queues its search document update
+        for name, value in (
+            ("task_always_eager", True),
+            ("CELERY_BROKER_URL", "memory://"),
+            ("CELERY_RESULT_BACKEND", "cache+memory://"),
+        ):
+            self.addCleanup(setattr, app.conf, name, app.conf[name])
+            setattr(app.conf, name, value)
+
+        User = get_user_model()
+        self.users = [
+            User.objects.create(username=name, email=f"{name}@example.com")
+            for name in ("saver", "reader")
+        ]
+        self.pattern = Pattern.objects.create(
+            author=self.users[0],
+            title="pattern",
+            difficulty=Pattern.DifficultyChoices.BEGINNER,
+            hook_or_needle_size=4,
+        )
+        self.tag = PatternTag.objects.create(name="hat")
+        self.pattern.tag.add(self.tag)
+
+    def list_patterns(self, user) -> tuple:
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse("patterns:patterns-list"))
+        [row] = response.data["results"]
+        return response["X-Cache"], row
+
+    def test_saving_only_invalidates_the_savers_lists(self):
+        for user in self.users:
+            self.assertEqual(self.list_patterns(user)[0], "MISS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.users[0].saved_patterns.add(self.pattern)
+
+        outcome, row = self.list_patterns(self.users[0])
+        self.assertEqual((outcome, row["is_saved"]), ("MISS", True))
+        self.assertEqual(self.list_patterns(self.users[1])[0], "HIT")
+
+    def test_renamed_tags_invalidate_the_lists(self):
+        self.list_patterns(self.users[1])
+        self.tag.name = "beanie"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.save()
+
+        outcome, row = self.list_patterns(self.users[1])
+        self.assertEqual(outcome, "MISS")
+        self.assertEqual([tag["name"] for tag in row["tags"]], ["beanie"])
@@ -1,16 +1,27 @@
 from django.core.cache import cache
-from django.db.models import Count
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
-from .tasks import send_pattern_saved_email
+from .tasks import send_pattern_saved_email, update_similar_patterns
 
 from .filtersets import PatternFilter, BasePatternFilter
-from .models import Category, Pattern, PatternTag, Material, YarnType
+from .facets import get_facets
+from .importers import READERS, PatternImporter, read_upload
+from .leaderboard import Leaderboard
+from .models import (
+    Category,
+    Pattern,
+    PatternSimilarity,
+    PatternTag,
+    Material,
+    YarnType,
+)
 from .serializers import (
     PatternTagSerializer,
     PatternSerializer,
@@ -18,13 +29,25 @@ from .serializers import (
     AddPatternSerializer,
     DetailCategorySerializer,
     MaterialSerializer,
+    PopularPatternsQuerySerializer,
+    SimilarPatternsQuerySerializer,
+)
+from utils.names import BulkNamesMixin
+from utils.response_cache import cache_response
+from utils.serializer_factory import (
+    SerializerFactory,
+    SparseFieldsetMixin,
+    get_sparse_fields,
 )
-from utils.serializer_factory import SerializerFactory
+from utils.values_serializer import ValuesListModelMixin
 
 SAVED_MILESTONE = 2
+FACETS_QUERY_PARAM = "facets"
 
 
-class PatternTagViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, GenericViewSet):
+class PatternTagViewSet(
+    BulkNamesMixin, mixins.ListModelMixin, mixins.CreateModelMixin, GenericViewSet
+):
     queryset = PatternTag.objects.order_by("id")
     permission_classes = [IsAuthenticated]
     serializer_class = PatternTagSerializer
@@ -37,14 +60,15 @@ class YarnTypeViewSet(mixins.ListModelMixin, GenericViewSet):
 
 
 class PatternViewSet(
+    SparseFieldsetMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
-    mixins.ListModelMixin,
+    ValuesListModelMixin,
     mixins.DestroyModelMixin,
     GenericViewSet,
 ):
     queryset = Pattern.objects.prefetch_related(
-        "tag", "category", "materials", "yarn_type", "saved", "category__subcategories"
+        "tag", "category", "materials", "yarn_type", "category__subcategories"
     ).select_related("author")
     permission_classes = [IsAuthenticated]
 
@@ -56,19 +80,45 @@ class PatternViewSet(
 
     filter_backends = [DjangoFilterBackend]
     filterset_class = PatternFilter
+    trimmed_actions = ("list", "saved_patterns", "popular_patterns")
 
     def get_queryset(self):
         qs = super().get_queryset()
 
-        if self.action == "saved_patterns":
-            qs = qs.filter(saved=self.request.user)
-            qs = qs.annotate(count_saved=Count("saved"))
+        if self.action == "popular_patterns":
+            # shared between users, is_saved is added after caching
             return qs
 
-        return qs.annotate(count_saved=Count("saved")).order_by("-created_at")
+        if self.requests_field("is_saved"):
+            qs = qs.annotate_is_saved(self.request.user)
+
+        if self.action == "saved_patterns":
+            return qs.filter(saved=self.request.user)
+
+        return qs.order_by("-created_at")
+
+    @cache_response(
+        "patterns", "saved:{user}", "categories", "pattern-names", per_user=True
+    )
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get(FACETS_QUERY_PARAM) in ("1", "true"):
+            # counts per difficulty, yarn type, tag and top-level category of
+            # everything matching the filters, not just the current page
+            response.data["facets"] = get_facets(
+                self.filter_queryset(self.get_queryset()),
+                self.filterset_class,
+                request.query_params,
+            )
+        return response
+
+    @cache_response("pattern:{pk}", "categories", "pattern-names", per_user=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        pattern = serializer.save(author=self.request.user)
+        transaction.on_commit(lambda: update_similar_patterns.delay([pattern.pk]))
 
     def destroy(self, request, *args, **kwargs):
         if self.get_object().author != request.user:
@@ -90,6 +140,7 @@ class PatternViewSet(
         if pattern:
             if request.method == "POST":
                 user.saved_patterns.add(pattern)
+                pattern.refresh_from_db(fields=["saved_count"])
                 if pattern.saved_count % SAVED_MILESTONE == 0:
                     send_pattern_saved_email.delay(
                         pattern.title,
@@ -104,6 +155,61 @@ class PatternViewSet(
 
         return Response({"error": "Pattern not found."}, status=404)
 
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[IsAuthenticated],
+        filterset_class=None,
+        pagination_class=None,
+        url_path="similar",
+        url_name="similar",
+    )
+    def similar(self, request, pk=None):
+        params = SimilarPatternsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        pattern = self.get_object()
+        neighbors = (
+            PatternSimilarity.objects.filter(pattern=pattern)
+            .values_list("neighbors", flat=True)
+            .first()
+        ) or []
+        ids = [pattern_id for pattern_id, _ in neighbors]
+        position = {pattern_id: index for index, pattern_id in enumerate(ids)}
+
+        # deleted patterns stay in the lists until the next rebuild
+        qs = self.filter_queryset(self.get_queryset()).filter(pk__in=ids)
+        qs = sorted(qs, key=lambda similar: position[similar.pk])
+        serializer = self.get_serializer(
+            qs[: params.validated_data["limit"]], many=True
+        )
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated],
+        serializer_class=None,
+        parser_classes=[MultiPartParser, JSONParser],
+        url_path="bulk-import",
+        url_name="bulk-import",
+    )
+    def bulk_import(self, request):
+        # a JSON list of patterns, or a JSONL/CSV upload in the "file" field
+        if isinstance(request.data, list):
+            rows = request.data
+        else:
+            upload = request.FILES.get("file")
+            file_format = request.data.get("format")
+            if upload is None:
+                raise ValidationError({"file": "Upload a JSONL or CSV file."})
+            if file_format and file_format not in READERS:
+                raise ValidationError({"format": "Supported formats: jsonl, csv."})
+            rows = read_upload(upload, file_format)
+
+        result = PatternImporter(author=request.user).run(rows)
+        return Response(result, status=201 if result["created"] else 400)
+
     @action(
         detail=False,
         methods=["get"],
@@ -124,25 +230,59 @@ class PatternViewSet(
         url_name="popular-patterns",
     )
     def popular_patterns(self, request):
-        cache_key = "popular_patterns"
-        timeout = 60
+        params = PopularPatternsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        limit = params.validated_data["limit"]
 
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
+        leaderboard = Leaderboard(
+            category_id=params.validated_data.get("category"),
+            tag_id=params.validated_data.get("tag_id"),
+        )
+        board = leaderboard.get(limit)
 
-        qs = self.get_queryset()
-        qs = qs.order_by("-count_saved")[:15]
+        fields, omit = get_sparse_fields(request)
+        cache_key = (
+            f"{leaderboard.key}:{board['build']}:{board['revision']}:{limit}:"
+            f"{sorted(fields or ())}:{sorted(omit or ())}"
+        )
+        timeout = 60
 
-        serializer = self.get_serializer(qs, many=True)
-        serialized_data = serializer.data
+        serialized_data = cache.get(cache_key)
+        if serialized_data is None:
+            serialized_data = self._serialize_leaderboard(board, limit)
+            cache.set(cache_key, serialized_data, timeout)
 
-        cache.set(cache_key, serialized_data, timeout)
+        if (
+            request.user.is_authenticated
+            and serialized_data
+            and "is_saved" in serialized_data[0]
+        ):
+            saved = set(
+                Pattern.saved.through.objects.filter(
+                    user_id=request.user.pk,
+                    pattern_id__in=[pattern["id"] for pattern in serialized_data],
+                ).values_list("pattern_id", flat=True)
+            )
+            serialized_data = [
+                {**pattern, "is_saved": pattern["id"] in saved}
+                for pattern in serialized_data
+            ]
 
         return Response(serialized_data)
 
+    def _serialize_leaderboard(self, board, limit: int):
+        ids = [pattern_id for _, pattern_id in board["entries"][:limit]]
+        position = {pattern_id: index for index, pattern_id in enumerate(ids)}
+        qs = sorted(
+            self.filter_queryset(self.get_queryset()).filter(pk__in=ids),
+            key=lambda pattern: position[pattern.pk],
+        )
 
-class CategoryViewSet(mixins.ListModelMixin, GenericViewSet):
+        serializer = self.get_serializer(qs, many=True)
+        return serializer.data
+
+
+class CategoryViewSet(SparseFieldsetMixin, mixins.ListModelMixin, GenericViewSet):
     queryset = Category.objects.select_related("parent").prefetch_related(
         "subcategories"
     )
@@ -150,6 +290,10 @@ class CategoryViewSet(mixins.ListModelMixin, GenericViewSet):
 
     serializer_class = SerializerFactory(default=DetailCategorySerializer)
 
+    @cache_response("categories")
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class MaterialViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, GenericViewSet):
     queryset = Material.objects.all()
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_alter_project_time_spent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectimage",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
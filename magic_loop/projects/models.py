@@ -40,3 +40,4 @@ class ProjectImage(models.Model):
         to=Project, on_delete=models.CASCADE, related_name="images"
     )
     image = models.ImageField(upload_to="project_photos/")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
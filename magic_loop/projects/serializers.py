@@ -4,9 +4,12 @@ from rest_framework import serializers
 
 from pattern.serializers import YarnTypeSerializer
 from .models import Project, ProjectImage
+from utils.images import ImageVariantsField
 
 
 class ProjectImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = ProjectImage
         fields = "__all__"
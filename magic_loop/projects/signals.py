@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import ProjectImage
+from .tasks import generate_project_image_variants
+from utils.images import image_variants_outdated
+
+
+@receiver(post_save, sender=ProjectImage)
+def schedule_image_variants(sender, instance, raw, **kwargs):
+    if not raw and image_variants_outdated(instance):
+        transaction.on_commit(
+            lambda: generate_project_image_variants.delay(instance.pk)
+        )
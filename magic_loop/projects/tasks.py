@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from utils.images import update_image_variants
+from .models import ProjectImage
+
+
+@shared_task
+def generate_project_image_variants(image_id: int):
+    update_image_variants(ProjectImage, image_id)
@@ -16,17 +16,19 @@ from .serializers import (
     UpdateProjectSerializer,
     ImageSerializer,
 )
-from utils.serializer_factory import SerializerFactory
+from utils.serializer_factory import SerializerFactory, SparseFieldsetMixin
+from utils.values_serializer import ValuesListModelMixin
 
 
 class ProjectViewSet(
+    SparseFieldsetMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
-    mixins.ListModelMixin,
+    ValuesListModelMixin,
     mixins.DestroyModelMixin,
     GenericViewSet,
 ):
-    queryset = Project.objects.all()
+    queryset = Project.objects.order_by("-id")
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_class = ProjectFilter
@@ -0,0 +1,107 @@
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+
+from community.models import Tag
+from pattern.models import Category, PatternTag, YarnType
+from utils.response_cache import get_tag_versions
+
+# Prefix lookups over short name lists, served from memory. Every process
+# keeps the names of each index in sorted arrays searched with bisect. A
+# change bumps the version of the index's tag in the shared cache (see
+# search/signals.py), and the next lookup in each process finds the new
+# version there and reloads the names. Lookups don't touch the database.
+# Without a shared cache (CACHE_URL) the versions stay in the process that
+# bumped them, the others only catch up when their names reach MAX_AGE.
+
+# seconds after which the names are reloaded even if the version is the same
+MAX_AGE = 60
+
+indexes = {}
+word_re = re.compile(r"\w+")
+
+
+def normalize(value: str) -> str:
+    # case and accent insensitive, "Crème" is found by "creme"
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class PrefixIndex:
+    def __init__(self, kind: str, model, field: str = "name"):
+        self.kind = kind
+        self.model = model
+        self.field = field
+        self.tag = f"autocomplete:{kind}"
+        self.version = None
+        self.expires = 0.0
+        # (keys, entries) of the whole names and of the words after the first,
+        # swapped together on reload
+        self.arrays = (([], []), ([], []))
+        self._lock = threading.Lock()
+        indexes[kind] = self
+
+    def load(self) -> tuple:
+        names, words = [], []
+        for pk, name in self.model.objects.values_list("pk", self.field):
+            key = normalize(name)
+            names.append((key, pk, name))
+            # "sock yarn" is found by "yarn" as well
+            words.extend(
+                (key[match.start() :], pk, name)
+                for match in list(word_re.finditer(key))[1:]
+            )
+        return tuple(
+            (
+                [key for key, _, _ in rows],
+                [(pk, name) for _, pk, name in rows],
+            )
+            for rows in (sorted(names), sorted(words))
+        )
+
+    def current(self, version: str) -> bool:
+        return version == self.version and time.monotonic() < self.expires
+
+    def refresh(self, version: str):
+        if self.current(version):
+            return
+        with self._lock:
+            if not self.current(version):
+                self.arrays = self.load()
+                self.version = version
+                self.expires = time.monotonic() + MAX_AGE
+
+    def lookup(self, prefix: str, limit: int) -> list:
+        # names starting with prefix first, then names with a word starting
+        # with it, alphabetically within both
+        prefix = normalize(prefix)
+        results, seen = [], set()
+        for keys, entries in self.arrays:
+            for index in range(bisect_left(keys, prefix), len(keys)):
+                if len(results) == limit or not keys[index].startswith(prefix):
+                    break
+                pk, name = entries[index]
+                if pk not in seen:
+                    seen.add(pk)
+                    results.append({"id": pk, "name": name})
+        return results
+
+
+PrefixIndex("pattern-tag", PatternTag)
+PrefixIndex("tag", Tag)
+PrefixIndex("yarn-type", YarnType)
+PrefixIndex("category", Category)
+
+
+def autocomplete(prefix: str, kinds, limit: int) -> list:
+    # at most limit names of every kind, one cache read for the versions
+    results = []
+    selected = [indexes[kind] for kind in kinds]
+    for index, version in zip(selected, get_tag_versions([i.tag for i in selected])):
+        index.refresh(version)
+        results.extend(
+            {"type": index.kind, **entry} for entry in index.lookup(prefix, limit)
+        )
+    return results
@@ -0,0 +1,159 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, transaction
+from django.urls import reverse
+
+from community.models import Post, Tag
+from pattern.models import Category, Pattern, PatternTag
+from projects.models import Project
+from .models import SearchDocument
+from utils.search import SearchIndex, get_search_backend
+
+# One index over the objects of every app: each source turns objects of its
+# model into SearchDocument rows of its kind, and the documents share a
+# single full-text index, so one query ranks all of them against each other.
+
+document_index = SearchIndex(SearchDocument, {"title": 4.0, "body": 1.0}, snippet=True)
+
+sources = {}
+
+
+class DocumentSource:
+    def __init__(self, kind: str, model, title: str, body=(), url=None):
+        self.kind = kind
+        self.model = model
+        self.title = title
+        self.body = list(body)
+        self.url = url
+        sources[kind] = self
+
+    def get_documents(self, pks) -> list:
+        objects = self.model.objects.filter(pk__in=pks).only(self.title, *self.body)
+        return [
+            SearchDocument(
+                kind=self.kind,
+                object_id=instance.pk,
+                title=getattr(instance, self.title),
+                body="\n".join(
+                    filter(None, (getattr(instance, field) for field in self.body))
+                ),
+            )
+            for instance in objects
+        ]
+
+    def get_url(self, object_id: int) -> str:
+        return self.url(object_id)
+
+
+def get_source(model):
+    return next((source for source in sources.values() if source.model is model), None)
+
+
+def detail_url(name: str):
+    return lambda pk: reverse(name, args=[pk])
+
+
+def filtered_url(name: str, param: str):
+    return lambda pk: f"{reverse(name)}?{param}={pk}"
+
+
+DocumentSource(
+    "pattern",
+    Pattern,
+    "title",
+    ["description", "tips"],
+    url=detail_url("patterns:patterns-detail"),
+)
+DocumentSource(
+    "post", Post, "title", ["content"], url=detail_url("community:posts-detail")
+)
+DocumentSource(
+    "project",
+    Project,
+    "name",
+    ["description"],
+    url=detail_url("projects:projects-detail"),
+)
+DocumentSource(
+    "category",
+    Category,
+    "name",
+    ["description"],
+    url=filtered_url("patterns:patterns-list", "category"),
+)
+DocumentSource(
+    "pattern-tag",
+    PatternTag,
+    "name",
+    url=filtered_url("patterns:patterns-list", "tag_id"),
+)
+DocumentSource("tag", Tag, "name", url=filtered_url("community:posts-list", "tag_id"))
+
+
+def get_document_search_backend():
+    return get_search_backend(document_index)
+
+
+def update_documents(kind: str, pks):
+    # brings the documents of the objects in line with the database, objects
+    # that are gone lose theirs
+    pks = list(pks)
+    backend = get_document_search_backend()
+    current = sources[kind].get_documents(pks)
+    object_ids = [document.object_id for document in current]
+    with transaction.atomic():
+        SearchDocument.objects.bulk_create(
+            current,
+            update_conflicts=True,
+            unique_fields=["kind", "object_id"],
+            update_fields=["title", "body"],
+        )
+        gone = list(
+            SearchDocument.objects.filter(kind=kind, object_id__in=pks)
+            .exclude(object_id__in=object_ids)
+            .values_list("pk", flat=True)
+        )
+        SearchDocument.objects.filter(pk__in=gone).delete()
+        backend.remove(gone)
+        backend.update(
+            SearchDocument.objects.filter(kind=kind, object_id__in=object_ids)
+        )
+
+
+def rebuild_documents(batch_size: int = 1000):
+    SearchDocument.objects.exclude(kind__in=list(sources)).delete()
+    for kind, source in sources.items():
+        stale = SearchDocument.objects.filter(kind=kind).exclude(
+            object_id__in=source.model.objects.values("pk")
+        )
+        stale.delete()
+        pks = list(source.model.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), batch_size):
+            update_documents(kind, pks[start : start + batch_size])
+    get_document_search_backend().rebuild()
+
+
+def search_documents(value: str, kinds, limit: int):
+    # ranked documents of the given kinds, at most limit of every kind, in one
+    # query: a UNION ALL of the best matches of each kind. SQLite can't rank
+    # FTS matches inside a window function and Django won't slice the parts of
+    # a union there, so the parts are wrapped in derived tables here.
+    backend = get_document_search_backend()
+    ranked = (
+        backend.search(SearchDocument.objects.only("kind", "object_id", "title"), value)
+        .annotate(rank=backend.rank())
+        .order_by("rank", "pk")
+    )
+    quote = connection.ops.quote_name
+    parts, params = [], []
+    for index, kind in enumerate(kinds):
+        try:
+            sql, part_params = ranked.filter(kind=kind)[:limit].query.sql_with_params()
+        except EmptyResultSet:
+            # nothing to search for
+            return SearchDocument.objects.none()
+        parts.append(f"SELECT * FROM ({sql}) {quote(f'part_{index}')}")
+        params.extend(part_params)
+    return SearchDocument.objects.raw(
+        f"{' UNION ALL '.join(parts)} ORDER BY {quote('rank')}, {quote('id')}",
+        params,
+    )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search.documents import rebuild_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the documents of the unified search from the indexed models."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_documents()
+        self.stdout.write(self.style.SUCCESS("Rebuilt the search documents."))
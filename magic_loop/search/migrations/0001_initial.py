@@ -0,0 +1,92 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+# the sources of search/documents.py when this was written:
+# (kind, model, title field, body fields)
+SOURCES = [
+    ("pattern", "pattern.Pattern", "title", ["description", "tips"]),
+    ("post", "community.Post", "title", ["content"]),
+    ("project", "projects.Project", "name", ["description"]),
+    ("category", "pattern.Category", "name", ["description"]),
+    ("pattern-tag", "pattern.PatternTag", "name", []),
+    ("tag", "community.Tag", "name", []),
+]
+
+
+def populate_documents(apps, schema_editor):
+    SearchDocument = apps.get_model("search", "SearchDocument")
+    for kind, label, title, body in SOURCES:
+        objects = apps.get_model(label).objects.values_list("pk", title, *body)
+        SearchDocument.objects.bulk_create(
+            (
+                SearchDocument(
+                    kind=kind,
+                    object_id=pk,
+                    title=title_value,
+                    body="\n".join(filter(None, body_values)),
+                )
+                for pk, title_value, *body_values in objects.iterator()
+            ),
+            batch_size=500,
+        )
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_searchdocument_fts USING fts5("
+        "title, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO search_searchdocument_fts (rowid, title, body) "
+        "SELECT id, title, body FROM search_searchdocument"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS search_searchdocument_fts")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("community", "0011_post_search_index"),
+        ("pattern", "0011_compress_text_pattern"),
+        ("projects", "0005_projectimage_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=20)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("body", models.TextField(blank=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id"), name="unique_search_document"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
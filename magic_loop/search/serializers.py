@@ -0,0 +1,52 @@
+from rest_framework import serializers
+
+from .autocomplete import indexes
+from .documents import sources
+from .models import SearchDocument
+from utils.search import SnippetField
+
+
+class TypesQuerySerializer(serializers.Serializer):
+    # ?types= as a comma separated subset of type_choices
+    types = serializers.CharField(required=False)
+    type_choices = {}
+
+    def validate_types(self, value):
+        kinds = [kind.strip() for kind in value.split(",") if kind.strip()]
+        unknown = set(kinds) - set(self.type_choices)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown types: {', '.join(sorted(unknown))}. "
+                f"Choose from {', '.join(self.type_choices)}."
+            )
+        return kinds
+
+    def get_types(self) -> list:
+        return self.validated_data.get("types") or list(self.type_choices)
+
+
+class SearchQuerySerializer(TypesQuerySerializer):
+    q = serializers.CharField()
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=5)
+    type_choices = sources
+
+
+class AutocompleteQuerySerializer(TypesQuerySerializer):
+    q = serializers.CharField(allow_blank=True, default="")
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    type_choices = indexes
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source="kind")
+    id = serializers.IntegerField(source="object_id")
+    snippet = SnippetField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SearchDocument
+        fields = ["type", "id", "title", "snippet", "url"]
+
+    def get_url(self, obj):
+        url = sources[obj.kind].get_url(obj.object_id)
+        return self.context["request"].build_absolute_uri(url)
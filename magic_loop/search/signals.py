@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .autocomplete import indexes
+from .documents import get_source, sources
+from .tasks import update_search_documents
+from utils.names import bulk_created
+from utils.response_cache import invalidate
+
+
+def queue_document_update(sender, instance, raw=False, **kwargs):
+    # the task reads the object again, so saves and deletes queue the same
+    if raw:
+        return
+    kind, pk = get_source(sender).kind, instance.pk
+    transaction.on_commit(lambda: update_search_documents.delay(kind, [pk]))
+
+
+for source in sources.values():
+    post_save.connect(
+        queue_document_update,
+        sender=source.model,
+        dispatch_uid=f"search-document-save-{source.kind}",
+    )
+    post_delete.connect(
+        queue_document_update,
+        sender=source.model,
+        dispatch_uid=f"search-document-delete-{source.kind}",
+    )
+
+
+def bump_autocomplete_version(sender, **kwargs):
+    tag = next(index.tag for index in indexes.values() if index.model is sender)
+    transaction.on_commit(lambda: invalidate(tag))
+
+
+for index in indexes.values():
+    post_save.connect(
+        bump_autocomplete_version,
+        sender=index.model,
+        dispatch_uid=f"autocomplete-save-{index.kind}",
+    )
+    post_delete.connect(
+        bump_autocomplete_version,
+        sender=index.model,
+        dispatch_uid=f"autocomplete-delete-{index.kind}",
+    )
+
+
+def index_bulk_created(sender, pks, **kwargs):
+    # rows inserted by get_or_create_by_name, which sends no post_save
+    source = get_source(sender)
+    if source is not None:
+        kind = source.kind
+        transaction.on_commit(lambda: update_search_documents.delay(kind, pks))
+    if any(index.model is sender for index in indexes.values()):
+        bump_autocomplete_version(sender)
+
+
+bulk_created.connect(index_bulk_created, dispatch_uid="search-bulk-created")
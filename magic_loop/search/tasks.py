@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .documents import update_documents
+
+
+@shared_task
+def update_search_documents(kind: str, pks: list):
+    update_documents(kind, pks)
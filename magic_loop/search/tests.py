@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from magic_loop.celery import app
+from pattern.models import Pattern
+
+
+class ImportedPatternSearchTests(TestCase):
+    def setUp(self):
+        # the documents are written by the tasks queued on commit, run them
+        # here without a broker (the settings' namespaced keys win over broker_url)
+        for name, value in (
+            ("task_always_eager", True),
+            ("CELERY_BROKER_URL", "memory://"),
+            ("CELERY_RESULT_BACKEND", "cache+memory://"),
+        ):
+            self.addCleanup(setattr, app.conf, name, app.conf[name])
+            setattr(app.conf, name, value)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create(
+                username="importer", email="importer@example.com"
+            )
+        )
+
+    def test_imported_patterns_are_searchable(self):
+        rows = [
+            {
+                "title": f"Zebra stripes hat {i}",
+                "text_pattern": "ch 4",
+                "difficulty": Pattern.DifficultyChoices.BEGINNER,
+                "hook_or_needle_size": 4,
+                "tags": ["hat"],
+            }
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("patterns:patterns-bulk-import"), rows, format="json"
+            )
+        self.assertEqual(response.data["created"], 3)
+
+        response = self.client.get(
+            reverse("search:search"), {"q": "zebra", "types": "pattern"}
+        )
+        self.assertEqual(
+            sorted(result["id"] for result in response.data["results"]),
+            sorted(Pattern.objects.values_list("pk", flat=True)),
+        )
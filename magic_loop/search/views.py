@@ -0,0 +1,43 @@
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .autocomplete import autocomplete
+from .documents import search_documents
+from .serializers import (
+    AutocompleteQuerySerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
+)
+
+
+class SearchView(GenericAPIView):
+    # patterns, posts, projects, categories and tags ranked together, at most
+    # ?limit= results of every type
+    permission_classes = [IsAuthenticated]
+    serializer_class = SearchResultSerializer
+    pagination_class = None
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        documents = search_documents(
+            query.validated_data["q"], query.get_types(), query.validated_data["limit"]
+        )
+        serializer = self.get_serializer(documents, many=True)
+        return Response({"results": serializer.data})
+
+
+class AutocompleteView(APIView):
+    # names of pattern tags, post tags, yarn types and categories starting
+    # with ?q=, or with a word starting with it, served from memory
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = AutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        results = autocomplete(
+            query.validated_data["q"], query.get_types(), query.validated_data["limit"]
+        )
+        return Response({"results": results})
@@ -1,17 +1,23 @@
+from django.db.models import Prefetch
 from rest_framework import mixins, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from pattern.models import Pattern
 from .models import User
 from .serializers import DetailUserSerializer, UserSerializer, CreateUserSerializer
-from utils.serializer_factory import SerializerFactory
+from utils.serializer_factory import SerializerFactory, SparseFieldsetMixin
 
 
-class UserViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, GenericViewSet):
-    queryset = User.objects.prefetch_related("saved_patterns", "patterns", "saved_patterns__tag",
-                                             "patterns__tag", "projects", "posts")
+class UserViewSet(
+    SparseFieldsetMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    GenericViewSet,
+):
+    queryset = User.objects.all()
     permission_classes = [IsAuthenticated]
 
     serializer_class = SerializerFactory(
@@ -20,6 +26,21 @@ class UserViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin, GenericViewS
         create=CreateUserSerializer,
     )
 
+    def get_queryset(self):
+        patterns = Pattern.objects.annotate_is_saved(self.request.user)
+        return (
+            super()
+            .get_queryset()
+            .prefetch_related(
+                Prefetch("saved_patterns", queryset=patterns),
+                Prefetch("patterns", queryset=patterns),
+                "saved_patterns__tag",
+                "patterns__tag",
+                "projects",
+                "posts",
+            )
+        )
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
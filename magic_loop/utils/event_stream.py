@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .pubsub import CLOSED, subscribe
+
+# Server-Sent Events over the pub/sub channels. The stream stays open, so it
+# is only served under ASGI, where it doesn't hold a worker thread.
+
+KEEPALIVE_INTERVAL = 15
+# how long clients wait before reconnecting, in milliseconds
+RETRY = 3000
+
+
+class EventStreamRenderer(BaseRenderer):
+    # lets content negotiation accept text/event-stream, responses other than
+    # the stream itself (errors) are sent as a single error event
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event("error", json.dumps(data, cls=JSONEncoder)).encode()
+
+
+def format_event(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def streaming_supported(request) -> bool:
+    return isinstance(request, ASGIRequest)
+
+
+async def _stream(channel: str, load_initial):
+    async with subscribe(channel) as queue:
+        yield f"retry: {RETRY}\n\n"
+        for event, data in await sync_to_async(load_initial)():
+            yield format_event(event, json.dumps(data, cls=JSONEncoder))
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is CLOSED:
+                return
+            yield format_event(*message)
+
+
+def event_stream_response(channel: str, load_initial) -> StreamingHttpResponse:
+    # load_initial returns (event, data) pairs describing the current state,
+    # it's called once subscribed so that nothing published in between is lost
+    response = StreamingHttpResponse(
+        _stream(channel, load_initial), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx would otherwise buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,33 @@
+import zlib
+
+from django.db import models
+
+COMPRESSION_LEVEL = 6
+
+
+class CompressedTextField(models.TextField):
+    # Text stored zlib compressed in a binary column and decompressed when
+    # loaded, so it behaves like a TextField everywhere except in lookups,
+    # which only see the compressed bytes.
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        try:
+            return zlib.decompress(value).decode()
+        except zlib.error:
+            # written before the column was compressed
+            return value.decode()
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        return connection.Database.Binary(
+            zlib.compress(value.encode(), COMPRESSION_LEVEL)
+        )
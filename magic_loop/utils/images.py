@@ -0,0 +1,91 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+# name -> bounding box, every variant is stored as WebP
+IMAGE_VARIANTS = {
+    "thumbnail": (320, 320),
+    "web": (1280, 1280),
+}
+WEBP_QUALITY = 80
+
+
+def image_variants_outdated(instance, field_name: str = "image") -> bool:
+    image = getattr(instance, field_name)
+    return (image.name or None) != (instance.image_variants or {}).get("source")
+
+
+def generate_image_variants(image) -> dict:
+    directory, filename = os.path.split(image.name)
+    basename, _ = os.path.splitext(filename)
+
+    with image.open("rb"):
+        original = ImageOps.exif_transpose(Image.open(image))
+        original.load()
+    if original.mode not in ("RGB", "RGBA"):
+        original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+
+    variants = {"source": image.name}
+    for name, size in IMAGE_VARIANTS.items():
+        variant = original.copy()
+        variant.thumbnail(size, Image.Resampling.LANCZOS)
+
+        content = BytesIO()
+        variant.save(content, format="WEBP", quality=WEBP_QUALITY, method=4)
+        variants[name] = image.storage.save(
+            os.path.join(directory, "variants", f"{basename}_{name}.webp"),
+            ContentFile(content.getvalue()),
+        )
+    return variants
+
+
+def update_image_variants(model, pk, field_name: str = "image"):
+    instance = model.objects.filter(pk=pk).only(field_name, "image_variants").first()
+    if instance is None or not image_variants_outdated(instance, field_name):
+        return
+
+    image = getattr(instance, field_name)
+    if not image:
+        model.objects.filter(pk=pk).update(image_variants={})
+        stale = instance.image_variants
+    else:
+        variants = generate_image_variants(image)
+        # keep the result only if the image hasn't been replaced meanwhile
+        updated = model.objects.filter(pk=pk, **{field_name: image.name}).update(
+            image_variants=variants
+        )
+        stale = instance.image_variants if updated else variants
+
+    for name in IMAGE_VARIANTS:
+        if stale.get(name):
+            image.storage.delete(stale[name])
+
+
+class ImageVariantsField(serializers.Field):
+    # read only {variant: url} of the generated images, None until they are
+    # ready, the original stays available through the image field itself
+
+    def __init__(self, image_field: str = "image", **kwargs):
+        self.image_field = image_field
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        return self.get_urls(image.name, instance.image_variants, image.storage)
+
+    def get_urls(self, source, variants, storage):
+        if not source or (variants or {}).get("source") != source:
+            return None
+
+        request = self.context.get("request")
+        urls = {}
+        for name in IMAGE_VARIANTS:
+            if variants.get(name):
+                url = storage.url(variants[name])
+                urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
@@ -0,0 +1,67 @@
+from django.db import models
+from django.dispatch import Signal
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+# sent with the pks of rows inserted in bulk (get_or_create_by_name, the
+# pattern importer), bulk inserts don't send post_save
+bulk_created = Signal()
+
+
+class NamedManager(models.Manager):
+    # for models identified by a unique name field
+
+    def get_or_create_by_name(self, names) -> dict:
+        # {name: pk} of every name, the missing ones inserted in one statement
+        # that leaves rows inserted concurrently alone
+        names = set(names)
+        if not names:
+            return {}
+        ids = dict(self.filter(name__in=names).values_list("name", "pk"))
+        missing = names - ids.keys()
+        if missing:
+            # the no-op update makes the database return the pk on conflicts
+            created = self.bulk_create(
+                [self.model(name=name) for name in missing],
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=["name"],
+            )
+            ids.update((instance.name, instance.pk) for instance in created)
+            bulk_created.send(
+                sender=self.model, pks=[instance.pk for instance in created]
+            )
+        return ids
+
+
+class NamesField(serializers.ListField):
+    # a list of names, stripped and without duplicates, in order
+
+    def __init__(self, max_name_length: int = 255, **kwargs):
+        kwargs.setdefault("child", serializers.CharField(max_length=max_name_length))
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        return list(dict.fromkeys(super().to_internal_value(data)))
+
+
+class NamesSerializer(serializers.Serializer):
+    # body of the bulk get or create endpoints
+    names = NamesField(allow_empty=False, max_length=1000)
+
+
+class BulkNamesMixin:
+    # POST {"names": [...]} to bulk/ returns the rows of all the names in the
+    # given order, creating the missing ones
+
+    @action(detail=False, methods=["post"], url_path="bulk", url_name="bulk")
+    def bulk(self, request):
+        names_serializer = NamesSerializer(data=request.data)
+        names_serializer.is_valid(raise_exception=True)
+        names = names_serializer.validated_data["names"]
+
+        model = self.get_queryset().model
+        ids = model.objects.get_or_create_by_name(names)
+        instances = [model(pk=ids[name], name=name) for name in names]
+        return Response(self.get_serializer(instances, many=True).data)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+# In-process pub/sub for the event streams. Subscribers are asyncio queues of
+# the event loop serving the stream, publishers can be any thread. A message
+# is an (event, data) pair, data already JSON encoded so every subscriber
+# gets the same string.
+#
+# Messages go through the broker of the PUBSUB setting: LocalBroker hands
+# them straight to the hub of this process, RedisBroker fans them out to the
+# hubs of every process subscribed to the channel.
+
+QUEUE_SIZE = 100
+# put in the queue of a subscriber that can't keep up, its stream ends and
+# the client reconnects
+CLOSED = object()
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def add(self, channel: str, loop, queue) -> bool:
+        # returns True for the first subscriber of the channel
+        with self._lock:
+            subscribers = self._subscribers[channel]
+            subscribers.add((loop, queue))
+            return len(subscribers) == 1
+
+    def discard(self, channel: str, loop, queue) -> bool:
+        # returns True when the last subscriber of the channel is gone
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if not subscribers:
+                return False
+            subscribers.discard((loop, queue))
+            if subscribers:
+                return False
+            del self._subscribers[channel]
+            return True
+
+    def channels(self) -> list:
+        with self._lock:
+            return list(self._subscribers)
+
+    def deliver(self, channel: str, message: tuple):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put, queue, message)
+            except RuntimeError:
+                # the loop is closed, its streams are gone
+                self.discard(channel, loop, queue)
+
+
+def _put(queue, message):
+    if queue.full():
+        return
+    if queue.qsize() == queue.maxsize - 1:
+        message = CLOSED
+    queue.put_nowait(message)
+
+
+class LocalBroker:
+    # single process, and the stand-in for tests
+    def __init__(self, hub: Hub, **options):
+        self.hub = hub
+
+    def publish(self, channel: str, message: tuple):
+        self.hub.deliver(channel, message)
+
+    def subscribed(self, channel: str):
+        pass
+
+    def unsubscribed(self, channel: str):
+        pass
+
+
+class RedisBroker(LocalBroker):
+    # needs the redis package, like the redis cache backend
+    key_prefix = "pubsub"
+    reconnect_delay = 1
+
+    def __init__(self, hub: Hub, url: str, **options):
+        import redis
+
+        super().__init__(hub)
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = None
+        self._lock = threading.Lock()
+
+    def _key(self, channel: str) -> str:
+        return f"{self.key_prefix}:{channel}"
+
+    def publish(self, channel: str, message: tuple):
+        self.client.publish(self._key(channel), json.dumps(message))
+
+    def subscribed(self, channel: str):
+        with self._lock:
+            if self.pubsub is None:
+                self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                # never published, keeps listen() going without other channels
+                self.pubsub.subscribe(self._key("-"))
+                threading.Thread(
+                    target=self._listen, name="pubsub-listener", daemon=True
+                ).start()
+            self.pubsub.subscribe(self._key(channel))
+
+    def unsubscribed(self, channel: str):
+        with self._lock:
+            # unless a new subscriber came along in the meantime
+            if channel not in self.hub.channels():
+                self.pubsub.unsubscribe(self._key(channel))
+
+    def _listen(self):
+        prefix = f"{self.key_prefix}:"
+        while True:
+            try:
+                for message in self.pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    channel = message["channel"].decode()[len(prefix) :]
+                    self.hub.deliver(channel, tuple(json.loads(message["data"])))
+            except Exception:
+                # redis-py resubscribes the channels when it reconnects
+                time.sleep(self.reconnect_delay)
+
+
+hub = Hub()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    config = settings.PUBSUB
+    return import_string(config["BROKER"])(hub, **config.get("OPTIONS", {}))
+
+
+def publish(channel: str, event: str, data):
+    get_broker().publish(channel, (event, json.dumps(data, cls=JSONEncoder)))
+
+
+@asynccontextmanager
+async def subscribe(channel: str):
+    # yields a queue of (event, data) messages published on the channel from
+    # now on, CLOSED when the subscriber fell behind
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(QUEUE_SIZE)
+    broker = get_broker()
+    if hub.add(channel, loop, queue):
+        await asyncio.to_thread(broker.subscribed, channel)
+    try:
+        yield queue
+    finally:
+        # not awaited, a stream closed by the garbage collector can't await
+        if hub.discard(channel, loop, queue):
+            loop.run_in_executor(None, broker.unsubscribed, channel)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+KEY_PREFIX = "response-cache"
+DEFAULT_TIMEOUT = 60 * 5
+
+# every cached response stores the versions of the tags it depends on in its
+# key, so bumping a tag version makes exactly the responses built from it
+# unreachable, the stale entries simply expire
+endpoints = set()
+
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _counter_key(endpoint: str, outcome: str) -> str:
+    return f"{KEY_PREFIX}:{outcome}:{endpoint}"
+
+
+def get_tag_versions(tags) -> list:
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*tags):
+    cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def changed_m2m_ids(sender, instance, action, reverse, pk_set, field, **kwargs):
+    # ids of the objects owning the M2M field that an m2m_changed signal
+    # touches, from either side of the relation; None while nothing changed yet
+    if not reverse:
+        return [instance.pk] if action.startswith("post_") else None
+    if action == "pre_clear":
+        instance._cleared_m2m_ids = list(
+            sender.objects.filter(
+                **{field.m2m_reverse_field_name(): instance.pk}
+            ).values_list(field.m2m_field_name(), flat=True)
+        )
+    elif action == "post_clear":
+        return getattr(instance, "_cleared_m2m_ids", [])
+    elif action.startswith("post_"):
+        return list(pk_set)
+    return None
+
+
+def _increment(key: str):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add and incr
+        cache.set(key, 1, None)
+
+
+def get_stats() -> dict:
+    keys = {
+        (endpoint, outcome): _counter_key(endpoint, outcome)
+        for endpoint in sorted(endpoints)
+        for outcome in ("hits", "misses")
+    }
+    counters = cache.get_many(keys.values())
+    return {
+        endpoint: {
+            outcome: counters.get(keys[endpoint, outcome], 0)
+            for outcome in ("hits", "misses")
+        }
+        for endpoint in sorted(endpoints)
+    }
+
+
+def _response_key(endpoint, request, tags, per_user, kwargs) -> str:
+    params = sorted(
+        (name, sorted(values)) for name, values in request.query_params.lists()
+    )
+    parts = [
+        endpoint,
+        sorted(kwargs.items()),
+        params,
+        request.user.pk if per_user else None,
+        get_tag_versions(tags),
+        request.accepted_media_type,
+    ]
+    digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+    return f"{KEY_PREFIX}:response:{endpoint}:{digest}"
+
+
+def cache_response(*tags, per_user=False, timeout=DEFAULT_TIMEOUT):
+    # tags are formatted with the URL kwargs and the id of the requesting user,
+    # e.g. "pattern:{pk}" or "saved:{user}", per_user keeps a separate entry
+    # for every user when the response depends on who is asking
+
+    def decorator(method):
+        endpoint = method.__qualname__
+        endpoints.add(endpoint)
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE:
+                return method(view, request, *args, **kwargs)
+
+            key = _response_key(
+                endpoint,
+                request,
+                [tag.format(user=request.user.pk, **kwargs) for tag in tags],
+                per_user,
+                kwargs,
+            )
+            data = cache.get(key)
+            if data is not None:
+                _increment(_counter_key(endpoint, "hits"))
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _increment(_counter_key(endpoint, "misses"))
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class ResponseCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats())
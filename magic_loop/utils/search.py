@@ -0,0 +1,176 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from utils.fields import CompressedTextField
+
+search_indexes = {}
+
+# around the matched terms in search_snippet, SnippetField turns them into marks
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+class SearchIndex:
+    def __init__(self, model, fields: dict, table: str = None, snippet=False):
+        # fields maps model field name -> relevance weight, with snippet the
+        # results get a search_snippet of the best matching field
+        self.model = model
+        self.fields = fields
+        self.table = table or f"{model._meta.db_table}_fts"
+        self.snippet = snippet
+        search_indexes[model._meta.label_lower] = self
+
+    def get_document(self, instance) -> list:
+        return [getattr(instance, field) or "" for field in self.fields]
+
+
+class BaseSearchBackend:
+    def __init__(self, index: SearchIndex):
+        self.index = index
+
+    def search(self, queryset, value: str):
+        raise NotImplementedError
+
+    def rank(self):
+        # the search_rank of the rows returned by search() as an expression,
+        # e.g. for window functions, lower ranks first
+        return Value(0.0, output_field=FloatField())
+
+    def update(self, instances):
+        pass
+
+    def remove(self, pks):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    # works on every database, but scans the table and doesn't rank results
+
+    def search(self, queryset, value: str):
+        query = Q()
+        for field in self.index.fields:
+            # compressed columns can't be matched by the database
+            if not isinstance(
+                self.index.model._meta.get_field(field), CompressedTextField
+            ):
+                query |= Q(**{f"{field}__icontains": value})
+        return queryset.filter(query)
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    # keeps a FTS5 virtual table whose rowid is the primary key of the model
+
+    token_re = re.compile(r"\w+")
+    # stays below SQLite's limit of bound parameters per statement
+    batch_size = 100
+    snippet_tokens = 16
+
+    def build_query(self, value: str) -> str:
+        # every term must match, the last one may be an unfinished word
+        return " ".join(f'"{term}"*' for term in self.token_re.findall(value))
+
+    def search(self, queryset, value: str):
+        query = self.build_query(value)
+        if not query:
+            return queryset.none()
+
+        table = connection.ops.quote_name(self.index.table)
+        model_table = connection.ops.quote_name(queryset.model._meta.db_table)
+        pk_column = connection.ops.quote_name(queryset.model._meta.pk.column)
+        select = {"search_rank": self.rank_sql()}
+        if self.index.snippet:
+            select["search_snippet"] = (
+                f"snippet({table}, -1, char({ord(HIGHLIGHT_START)}), "
+                f"char({ord(HIGHLIGHT_END)}), '…', {self.snippet_tokens})"
+            )
+
+        return queryset.extra(
+            tables=[self.index.table],
+            where=[f"{table}.rowid = {model_table}.{pk_column}", f"{table} MATCH %s"],
+            params=[query],
+            select=select,
+            order_by=["search_rank"],
+        )
+
+    def rank_sql(self) -> str:
+        table = connection.ops.quote_name(self.index.table)
+        weights = ", ".join(str(weight) for weight in self.index.fields.values())
+        return f"bm25({table}, {weights})"
+
+    def rank(self):
+        return RawSQL(self.rank_sql(), [], output_field=FloatField())
+
+    def update(self, instances):
+        rows = [
+            [instance.pk, *self.index.get_document(instance)] for instance in instances
+        ]
+        for start in range(0, len(rows), self.batch_size):
+            self._insert(rows[start : start + self.batch_size])
+
+    def _insert(self, rows):
+        self.remove([row[0] for row in rows])
+
+        table = connection.ops.quote_name(self.index.table)
+        columns = ", ".join(["rowid", *self.index.fields])
+        placeholders = "({})".format(", ".join(["%s"] * len(rows[0])))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"VALUES {', '.join([placeholders] * len(rows))}",
+                [value for row in rows for value in row],
+            )
+
+    def remove(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+
+        table = connection.ops.quote_name(self.index.table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(pks))})",
+                pks,
+            )
+
+    def rebuild(self):
+        table = connection.ops.quote_name(self.index.table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table}")
+
+        instances = self.index.model.objects.only(*self.index.fields).order_by("pk")
+        self.update(instances.iterator(chunk_size=1000))
+
+
+class SnippetField(serializers.CharField):
+    # the search_snippet of a search result as HTML, matches wrapped in <mark>,
+    # None outside of searches or with backends that don't make snippets
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("source", "search_snippet")
+        super().__init__(read_only=True, default=None, **kwargs)
+
+    def to_representation(self, value):
+        return (
+            escape(value)
+            .replace(HIGHLIGHT_START, "<mark>")
+            .replace(HIGHLIGHT_END, "</mark>")
+        )
+
+
+def get_search_backend(index: SearchIndex) -> BaseSearchBackend:
+    backend = getattr(settings, "SEARCH_BACKEND", None)
+    if backend:
+        return import_string(backend)(index)
+    if connection.vendor == "sqlite":
+        return SQLiteFTSSearchBackend(index)
+    return DatabaseSearchBackend(index)
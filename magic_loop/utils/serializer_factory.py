@@ -1,5 +1,116 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.views import APIView
 
+from utils.images import ImageVariantsField
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def get_sparse_fields(request):
+    # ?fields=id,title keeps only the listed fields, ?omit=tags drops them
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+
+    def names(param):
+        value = request.query_params.get(param)
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    return names(FIELDS_QUERY_PARAM), names(OMIT_QUERY_PARAM)
+
+
+def trim_fields(serializer, request):
+    if isinstance(serializer, serializers.ListSerializer):
+        trim_fields(serializer.child, request)
+        return serializer
+
+    fields, omit = get_sparse_fields(request)
+    if fields is None and omit is None:
+        return serializer
+
+    unknown = ((fields or set()) | (omit or set())) - set(serializer.fields)
+    if unknown:
+        raise ValidationError(
+            {FIELDS_QUERY_PARAM: f'Unknown fields: {", ".join(sorted(unknown))}.'}
+        )
+
+    for name in list(serializer.fields):
+        if (fields is not None and name not in fields) or name in (omit or ()):
+            serializer.fields.pop(name)
+    return serializer
+
+
+def reads_relation(serializer, path) -> bool:
+    # whether the fields of serializer go through the relation path, e.g.
+    # ["category", "subcategories"] for a category__subcategories prefetch
+    for field in serializer.fields.values():
+        source = field.source.split('.')
+        if source[0] != path[0]:
+            continue
+        if len(path) == 1 or len(source) > 1:
+            return True
+        nested = getattr(field, 'child', field)
+        if isinstance(nested, serializers.BaseSerializer) and reads_relation(
+            nested, path[1:]
+        ):
+            return True
+    return False
+
+
+def trim_queryset(queryset, serializer):
+    # Skips the prefetches and columns the serializer's fields don't read.
+    # Fields backed by something other than model fields and annotations
+    # (properties, "*" sources) may read anything, so the queryset is left as
+    # it is then.
+    opts = queryset.model._meta
+    roots, related_roots = set(), set()
+    for field in serializer.fields.values():
+        if isinstance(field, ImageVariantsField):
+            roots |= {field.image_field, 'image_variants'}
+            continue
+        root = field.source.split('.')[0]
+        if root in queryset.query.annotations:
+            continue
+        if field.default is not empty and not hasattr(queryset.model, root):
+            # an annotation added elsewhere, the default is used without it
+            continue
+        try:
+            opts.get_field(root)
+        except FieldDoesNotExist:
+            return queryset
+        roots.add(root)
+        if '.' in field.source or isinstance(field, serializers.BaseSerializer):
+            related_roots.add(root)
+
+    prefetches = [
+        lookup
+        for lookup in queryset._prefetch_related_lookups
+        if reads_relation(
+            serializer, getattr(lookup, 'prefetch_through', lookup).split('__')
+        )
+    ]
+    columns = {opts.pk.name} | {
+        name for name in roots if opts.get_field(name).concrete
+    }
+    # the paginators read the ordering columns of every page
+    for order in queryset.query.order_by:
+        if isinstance(order, str) and order.lstrip('-') != 'pk':
+            columns.add(order.lstrip('-').split('__')[0])
+
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetches)
+    if isinstance(queryset.query.select_related, dict):
+        select_related = [
+            name for name in queryset.query.select_related if name in related_roots
+        ]
+        queryset = queryset.select_related(None).select_related(*select_related)
+    return queryset.only(*columns)
+
 
 class SerializerGetter:
     def __init__(self, default, **kwargs):
@@ -16,7 +127,7 @@ class SerializerGetter:
         context = kwargs.get('context', {})
         view: APIView = context.get('view')
         serializer_class = self.get_serializer_class(view)
-        return serializer_class(*args, **kwargs)
+        return trim_fields(serializer_class(*args, **kwargs), context.get('request'))
 
 
 class SerializerFactory:
@@ -25,5 +136,28 @@ class SerializerFactory:
             default=default, **kwargs,
         )
 
+    def get_serializer_class(self, view: [APIView]):
+        return self.serializer_getter.get_serializer_class(view)
+
     def __call__(self, *args, **kwargs):
         return self.serializer_getter(*args, **kwargs)
+
+
+class SparseFieldsetMixin:
+    # Trims the queryset to the fields requested with ?fields= / ?omit=, and
+    # to the fields of the serializer for trimmed_actions, so e.g. lists don't
+    # load large text columns only the detail serializer shows.
+    trimmed_actions = ()
+
+    def requests_field(self, name: str) -> bool:
+        fields, omit = get_sparse_fields(self.request)
+        return (fields is None or name in fields) and name not in (omit or ())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, omit = get_sparse_fields(self.request)
+        if (
+            fields is None and omit is None and self.action not in self.trimmed_actions
+        ) or self.get_serializer_class() is None:
+            return queryset
+        return trim_queryset(queryset, self.get_serializer())
@@ -0,0 +1,159 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import mixins, serializers
+from rest_framework.response import Response
+
+from utils.images import ImageVariantsField
+
+
+class ValuesSerializer:
+    # Produces the same output as a DRF ModelSerializer from .values() rows.
+    # Model fields reuse the DRF field's to_representation on the raw column,
+    # foreign keys are emitted as ids and nested many=True serializers of M2M
+    # relations are filled from one grouped query per relation, so no model
+    # instances and no per-row serializer calls are needed.
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.model = self.serializer.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.columns = [self.pk]
+        self.optional_columns = []
+        self.many = []
+        self.fields = []
+        for name, field in self.serializer.fields.items():
+            if not field.write_only:
+                self.fields.append((name, self.compile(name, field)))
+
+    def compile(self, name, field):
+        if isinstance(field, ImageVariantsField):
+            image = self.model._meta.get_field(field.image_field)
+            self.columns += [image.attname, "image_variants"]
+            return lambda row, related: field.get_urls(
+                row[image.attname], row["image_variants"], image.storage
+            )
+
+        if isinstance(field, serializers.ListSerializer):
+            return self.compile_many(name, field)
+
+        source = field.source
+        try:
+            model_field = self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            if field.default is not serializers.empty:
+                # e.g. annotations the queryset only adds for some requests
+                self.optional_columns.append(source)
+                return self.annotation(field, source)
+            raise ImproperlyConfigured(
+                f"{self.model.__name__}.{source} needs an annotation to be "
+                f"serialized from values."
+            )
+
+        if model_field.many_to_one or model_field.one_to_one:
+            self.columns.append(model_field.attname)
+            return lambda row, related: row[model_field.attname]
+
+        if model_field.is_relation:
+            raise ImproperlyConfigured(
+                f"{type(field).__name__} {name} can't be serialized from values."
+            )
+
+        self.columns.append(model_field.attname)
+        if hasattr(model_field, "attr_class"):
+            # FileField and ImageField build their urls from a FieldFile
+            def file(row, related):
+                value = row[model_field.attname]
+                if value is None:
+                    return None
+                return field.to_representation(
+                    model_field.attr_class(None, model_field, value)
+                )
+
+            return file
+        return self.plain(field, model_field.attname)
+
+    def compile_many(self, name, field):
+        model_field = self.model._meta.get_field(field.source)
+        if not model_field.many_to_many or model_field.auto_created:
+            raise ImproperlyConfigured(
+                f"Only M2M fields can be nested, {name} is not one."
+            )
+
+        child = ValuesSerializer(field.child)
+        owner = model_field.related_query_name()
+        self.many.append((name, child, owner))
+        return lambda row, related: related[name].get(row[self.pk], [])
+
+    @staticmethod
+    def plain(field, column):
+        def plain(row, related):
+            value = row[column]
+            return None if value is None else field.to_representation(value)
+
+        return plain
+
+    @staticmethod
+    def annotation(field, column):
+        def annotation(row, related):
+            value = row.get(column, field.default)
+            return None if value is None else field.to_representation(value)
+
+        return annotation
+
+    def get_queryset(self, queryset):
+        queryset = queryset.prefetch_related(None)
+        columns = self.columns + [
+            name
+            for name in self.optional_columns
+            if name in queryset.query.annotations or name in queryset.query.extra
+        ]
+        # the paginators read the ordering columns of the last row for cursors
+        for order in queryset.query.order_by:
+            if isinstance(order, str):
+                columns.append(order.lstrip("-"))
+        return queryset.values(*dict.fromkeys(columns))
+
+    def get_related(self, pks):
+        related = {}
+        for name, child, owner in self.many:
+            grouped = defaultdict(list)
+            rows = list(
+                child.model.objects.filter(**{f"{owner}__in": pks}).values(
+                    owner, *dict.fromkeys(child.columns)
+                )
+            )
+            children = child.serialize(rows)
+            for row, data in zip(rows, children):
+                grouped[row[owner]].append(data)
+            related[name] = grouped
+        return related
+
+    def serialize(self, rows) -> list:
+        rows = list(rows)
+        related = self.get_related([row[self.pk] for row in rows]) if self.many else {}
+        return [
+            {name: represent(row, related) for name, represent in self.fields}
+            for row in rows
+        ]
+
+
+class ValuesListModelMixin(mixins.ListModelMixin):
+    # Lists through ValuesSerializer instead of building model instances and
+    # running the DRF serializer per row, settings.VALUES_LIST_SERIALIZATION
+    # switches back to the regular path.
+    def get_values_serializer(self):
+        return ValuesSerializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, "VALUES_LIST_SERIALIZATION", True):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.get_values_serializer()
+        queryset = serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))